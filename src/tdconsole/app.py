@@ -0,0 +1,268 @@
+import threading
+
+from sqlalchemy import inspect
+from textual import on, work
+from textual.app import App
+from textual.reactive import reactive
+from textual.screen import Screen
+from textual.widgets import Button, ListView
+from textual.worker import get_current_worker
+
+from tdconsole.core import tabsdata_api
+from tdconsole.core.catalog_store import CATALOG_REFRESH_INTERVAL, CatalogStore
+from tdconsole.core.db import start_session, worker_sessions
+from tdconsole.core.find_instances import query_session, resolve_working_instance
+from tdconsole.core.find_instances import (
+    sync_filesystem_instances_to_db as sync_filesystem_instances_to_db,
+)
+from tdconsole.core.instance_watcher import InstanceWatcher
+from tdconsole.core.models import Instance, get_model_by_tablename
+from tdconsole.core.server_health import add_listener, remove_listener
+
+
+def install_rich_traceback() -> None:
+    import sqlalchemy
+    import textual
+    from rich.traceback import install
+
+    install(
+        show_locals=False,  # or True if you like locals
+        suppress=[textual, sqlalchemy],
+    )
+
+
+class NestedMenuApp(App):
+    CSS = """
+    * {
+    height: auto;
+    }
+    ListView {
+    height: auto;
+}
+    VerticalScroll {
+        width: 1fr;
+    }
+
+    #right {
+        overflow-y: hidden;
+    }
+    """
+    BINDINGS = [
+        ("ctrl+c", "quit", "Quit"),
+        ("ctrl+b", "go_back", "Go Back"),
+    ]
+    working_instance = reactive(None, init=False)
+    # True until the first filesystem reconcile after startup has finished;
+    # until then the Instance rows are the ones left by the previous run.
+    instances_stale = reactive(True, init=False)
+
+    def __init__(self, on_first_frame=None, **kwargs):
+        super().__init__(**kwargs)
+        self.on_first_frame = on_first_frame
+        # Render from the last-known rows; the watcher reconciles them with
+        # the filesystem once the app is running.
+        self.session = start_session(sync=False)[0]
+        self.session.info["app"] = self
+        self.tabsdata_server = None
+        self.catalog_store = CatalogStore(self)
+        self._instance_sync_pending = False
+        self.instance_watcher = InstanceWatcher(
+            worker_sessions(self.session.get_bind()),
+            on_change=self._instances_changed_from_thread,
+            on_ready=self._instances_ready_from_thread,
+        )
+        # Assign without firing watch_working_instance: nothing may connect
+        # to the server before the first frame is drawn.
+        self.set_reactive(
+            NestedMenuApp.working_instance,
+            resolve_working_instance(app=self, session=self.session),
+        )
+
+    def on_mount(self) -> None:
+        from tdconsole.textual_assets.api_processor import process_response
+
+        self.instance_watcher.start()
+        add_listener(self._server_health_changed)
+        self.set_interval(CATALOG_REFRESH_INTERVAL, self.catalog_store.refresh)
+        # start with a MainMenu instance
+        process_response(self, "_mount")
+        self.call_after_refresh(self._first_frame)
+
+    def _first_frame(self) -> None:
+        install_rich_traceback()
+        if self.on_first_frame is not None:
+            self.on_first_frame()
+        # Connect to the last-known working instance now that the UI is up;
+        # handle_instances_ready reconnects if the reconcile changes it.
+        if self.working_instance is not None and self.tabsdata_server is None:
+            self.connect_tabsdata_server()
+
+    def action_go_back(self):
+        if len(self.screen_stack) > 2:
+            self.pop_screen()
+        # self.install_screen(active_screen_class(), active_screen_name)
+
+    def handle_api_response(self, screen: Screen, label: str | None = None) -> None:
+        from tdconsole.textual_assets.api_processor import process_response
+
+        process_response(screen, label)
+
+    def app_query_session(self, model, limit=None, *conditions, **filters):
+        model = get_model_by_tablename(model)
+        session = self.session
+        query = query_session(session, model, limit, *conditions, **filters)
+        return query
+
+    def watch_working_instance(self, old, new):
+        old = (
+            None
+            if old is None
+            else {
+                attr.key: getattr(old, attr.key)
+                for attr in inspect(old).mapper.column_attrs
+            }
+        )
+        new = (
+            None
+            if new is None
+            else {
+                attr.key: getattr(new, attr.key)
+                for attr in inspect(new).mapper.column_attrs
+            }
+        )
+        if new != old and new is not None:
+            # Drop the old instance's client so nothing reads from it while
+            # the new connection opens in the background.
+            self.tabsdata_server = None
+            self.connect_tabsdata_server()
+
+    def _instances_changed_from_thread(self, names) -> None:
+        try:
+            self.call_from_thread(self.handle_instances_changed, names)
+        except RuntimeError:
+            # App is not running yet (or already shut down).
+            pass
+
+    def on_unmount(self) -> None:
+        remove_listener(self._server_health_changed)
+
+    def _server_health_changed(self, health) -> None:
+        # Trackers change state on whichever thread made the call.
+        if threading.get_ident() == self._thread_id:
+            self.refresh_server_health()
+            return
+        try:
+            self.call_from_thread(self.refresh_server_health)
+        except RuntimeError:
+            pass
+
+    def refresh_server_health(self) -> None:
+        for widget in self.screen.query("CurrentInstanceWidget"):
+            widget.refresh(recompose=True)
+
+    def _instances_ready_from_thread(self) -> None:
+        try:
+            self.call_from_thread(self.handle_instances_ready)
+        except RuntimeError:
+            pass
+
+    def handle_instances_ready(self) -> None:
+        """First reconcile is done: re-resolve the working instance and connect."""
+        self.session.expire_all()
+        previous = self.working_instance
+        working_instance = resolve_working_instance(app=self, session=self.session)
+        # Assign without firing watch_working_instance; the connection is
+        # opened below in the background if it is not already up.
+        self.set_reactive(NestedMenuApp.working_instance, working_instance)
+        self.instances_stale = False
+        if working_instance is not previous or self.tabsdata_server is None:
+            self.connect_tabsdata_server()
+        self.refresh_instance_widgets()
+
+    def request_instance_sync(self) -> None:
+        """
+        Reconcile instances with the filesystem in a worker. Only needed
+        while the instance watcher is not running; repeat requests made
+        while one is in flight are ignored.
+        """
+        if self._instance_sync_pending:
+            return
+        self._instance_sync_pending = True
+        self._sync_instances()
+
+    @work(thread=True, group="instance-sync", exit_on_error=False)
+    def _sync_instances(self) -> None:
+        registry = worker_sessions(self.session.get_bind())
+        names = set()
+        try:
+            instances = sync_filesystem_instances_to_db(session=registry())
+            names = {instance.name for instance in instances}
+        finally:
+            registry.remove()
+            try:
+                self.call_from_thread(self._instances_synced, names)
+            except RuntimeError:
+                pass
+
+    def _instances_synced(self, names) -> None:
+        self._instance_sync_pending = False
+        if self.working_instance is not None:
+            # Covers a working instance that was removed on disk.
+            names = names | {self.working_instance.name}
+        self.handle_instances_changed(names)
+
+    def refresh_instance_widgets(self) -> None:
+        for widget in self.screen.query("CurrentInstanceWidget"):
+            widget.refresh(recompose=True)
+        for panel in self.screen.query("InstanceInfoPanel"):
+            panel.refresh_widget()
+
+    def handle_instances_changed(self, names) -> None:
+        working_instance = self.working_instance
+        if working_instance is not None and working_instance.name in names:
+            pid = working_instance.pid
+            refreshed = (
+                self.session.query(Instance)
+                .populate_existing()
+                .filter_by(name=working_instance.name)
+                .first()
+            )
+            if refreshed is None or refreshed.status == "Not Running":
+                self.working_instance = None
+            elif refreshed.pid != pid:
+                # A restarted server does not accept the old client's tokens.
+                self.connect_tabsdata_server()
+        for widget in self.screen.query("CurrentInstanceWidget"):
+            widget.refresh(recompose=True)
+
+    def connect_tabsdata_server(self) -> None:
+        """Open the server connection for the working instance off the event loop."""
+        instance = self.working_instance
+        if instance is not None:
+            # Load the columns here so the worker never lazy-loads on self.session.
+            instance.ext_socket
+        self._connect_tabsdata_server(instance)
+
+    @work(thread=True, exclusive=True, group="tabsdata-server")
+    def _connect_tabsdata_server(self, instance) -> None:
+        server = tabsdata_api.initialize_tabsdata_server_connection(self)
+        if get_current_worker().is_cancelled or instance is not self.working_instance:
+            return
+        self.call_from_thread(self._tabsdata_server_connected, server)
+
+    def _tabsdata_server_connected(self, server) -> None:
+        self.tabsdata_server = server
+        self.catalog_store.refresh()
+        for panel in self.screen.query("InstanceInfoPanel"):
+            panel.refresh_widget()
+
+    @on(ListView.Highlighted)
+    async def on_select_highlighted(self, event: ListView.Highlighted):
+        # Scroll the highlighted list itself into view
+        item = event.list_view.highlighted_child
+        if item:
+            item.scroll_visible()
+
+    @on(Button.Pressed, "#exit-btn")
+    def on_exit_pressed(self, event: Button.Pressed) -> None:
+        self.exit()
@@ -0,0 +1,61 @@
+from textual.message import Message
+from textual.worker import Worker, get_current_worker
+
+BLOCKING_GROUP = "blocking-io"
+
+
+class BlockingCallDone(Message):
+    """
+    Posted to the node that started run_blocking once the call returns.
+
+    error is the exception the call raised, or None; result is None on
+    error. key tells apart several kinds of call made by the same node.
+    """
+
+    bubble = False
+
+    def __init__(self, key, result=None, error=None):
+        super().__init__()
+        self.key = key
+        self.result = result
+        self.error = error
+
+
+def run_blocking(
+    node,
+    fn,
+    *args,
+    key=None,
+    group: str = BLOCKING_GROUP,
+    exclusive: bool = False,
+    **kwargs,
+) -> Worker:
+    """
+    Run fn(*args, **kwargs) on a thread worker owned by node and post the
+    outcome back to node as BlockingCallDone.
+
+    Use this for anything that can wait on the network, the disk or a
+    subprocess (TabsdataServer calls, filesystem syncs) so the event loop
+    keeps drawing frames. The result of a worker that was cancelled, e.g.
+    replaced in an exclusive group, is dropped, as is one for a node that has
+    been removed in the meantime.
+    """
+    key = key or getattr(fn, "__name__", "call")
+
+    def call() -> None:
+        worker = get_current_worker()
+        try:
+            result, error = fn(*args, **kwargs), None
+        except Exception as exc:
+            result, error = None, exc
+        if not worker.is_cancelled:
+            node.post_message(BlockingCallDone(key, result, error))
+
+    return node.run_worker(
+        call,
+        name=key,
+        group=group,
+        thread=True,
+        exclusive=exclusive,
+        exit_on_error=False,
+    )
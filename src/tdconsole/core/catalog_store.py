@@ -0,0 +1,341 @@
+import time
+import weakref
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from textual.message import Message
+
+from tdconsole.core import tabsdata_api
+from tdconsole.core.db import worker_sessions
+from tdconsole.core.models import Collection, Function, Instance, Table
+
+CATALOG_REFRESH_INTERVAL = 30.0
+# A no-op refresh only rewrites Instance.catalog_synced_at this often.
+CATALOG_STAMP_INTERVAL = 300.0
+
+LIVE = "live"
+CACHED = "cached"
+
+
+@dataclass(frozen=True)
+class CachedCollection:
+    """Collection loaded from the local DB rather than the server."""
+
+    name: str
+
+
+@dataclass(frozen=True)
+class CachedFunction:
+    name: str
+    collection: CachedCollection
+
+
+@dataclass(frozen=True)
+class CachedTable:
+    name: str
+    collection: CachedCollection
+
+
+class CatalogChanged(Message):
+    """
+    Posted to every subscriber when a refresh changes the catalog.
+
+    kind is "collection", "function" or "table"; collection is None for
+    collection changes and the owning collection otherwise.
+    """
+
+    def __init__(self, instance_name, kind, collection, added, removed):
+        super().__init__()
+        self.instance_name = instance_name
+        self.kind = kind
+        self.collection = collection
+        self.added = added
+        self.removed = removed
+
+
+def _names(items) -> set[str]:
+    return {getattr(item, "name", str(item)) for item in items or []}
+
+
+def format_age(seconds: float) -> str:
+    if seconds < 60:
+        return f"{int(seconds)}s"
+    if seconds < 3600:
+        return f"{int(seconds // 60)}m"
+    if seconds < 86400:
+        return f"{int(seconds // 3600)}h"
+    return f"{int(seconds // 86400)}d"
+
+
+class CatalogStore:
+    """
+    App-wide copy of the working instance's collections, functions and
+    tables.
+
+    When the working instance changes the store is seeded from the catalog
+    last synced to SQLite (source CACHED), so lists render without waiting
+    on the server. Reads are in-memory and never touch the server.
+    refresh() reloads the catalog in a thread worker, persists it to the DB with
+    apply_catalog_diff and, back on the event loop, posts CatalogChanged to
+    subscribed widgets for every collection, function and table list that
+    changed.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.instance_name = None
+        self.collections: dict = {}
+        self.functions: dict[str, list] = {}
+        self.tables: dict[str, list] = {}
+        # kind -> asset name -> collections holding it; kept in step with
+        # functions/tables so lookups by name never scan collections.
+        self._index: dict[str, dict[str, set[str]]] = {"function": {}, "table": {}}
+        self.refreshed_at = None
+        self.source = None
+        self._loading = None
+        self._subscribers = weakref.WeakSet()
+
+    # ------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------
+
+    def subscribe(self, widget) -> None:
+        self._subscribers.add(widget)
+
+    def unsubscribe(self, widget) -> None:
+        self._subscribers.discard(widget)
+
+    def _publish(self, message_args) -> None:
+        for args in message_args:
+            for widget in list(self._subscribers):
+                if widget.is_attached:
+                    widget.post_message(CatalogChanged(*args))
+
+    # ------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------
+
+    def describe_age(self) -> str:
+        if self.refreshed_at is None:
+            return "not synced yet"
+        age = format_age(max(0.0, time.time() - self.refreshed_at))
+        if self.source == LIVE:
+            return f"live · updated {age} ago"
+        return f"cached · {age} old"
+
+    def collection_list(self) -> list:
+        return [self.collections[name] for name in sorted(self.collections)]
+
+    def collection_names(self) -> list[str]:
+        return sorted(self.collections)
+
+    def functions_of(self, collection: str) -> list:
+        return list(self.functions.get(collection, []))
+
+    def tables_of(self, collection: str) -> list:
+        return list(self.tables.get(collection, []))
+
+    def function_names(self, collection: str | None = None) -> list[str]:
+        if collection:
+            return sorted(_names(self.functions.get(collection)))
+        return sorted(self._index["function"])
+
+    def table_names(self, collection: str | None = None) -> list[str]:
+        if collection:
+            return sorted(_names(self.tables.get(collection)))
+        return sorted(self._index["table"])
+
+    def collections_containing(self, name: str, kind: str | None = None) -> list[str]:
+        """Collections holding a function (kind "fn") or table ("table") named name."""
+        kinds = {"fn": ("function",), "table": ("table",)}.get(kind, ("function", "table"))
+        matches = set()
+        for index_kind in kinds:
+            matches.update(self._index[index_kind].get(name, ()))
+        return sorted(matches)
+
+    def _index_update(self, kind, collection, added=(), removed=()) -> None:
+        index = self._index[kind]
+        for name in removed:
+            holders = index.get(name)
+            if holders is not None:
+                holders.discard(collection)
+                if not holders:
+                    del index[name]
+        for name in added:
+            index.setdefault(name, set()).add(collection)
+
+    # ------------------------------------------------------------
+    # Refresh
+    # ------------------------------------------------------------
+
+    def sync_instance(self) -> str | None:
+        """Follow the app's working instance, seeding from the DB on a switch."""
+        instance_name = getattr(self.app.working_instance, "name", None)
+        if instance_name != self.instance_name:
+            self._reset(instance_name)
+        return instance_name
+
+    def refresh(self) -> None:
+        """
+        Reload the catalog from the server in the background. A refresh
+        while one is already running for the same instance is a no-op.
+        """
+        instance_name = self.sync_instance()
+        server = self.app.tabsdata_server
+        if server is None or instance_name is None:
+            return
+        if self._loading == instance_name:
+            return
+        self._loading = instance_name
+        self.app.run_worker(
+            lambda: self._load(server, instance_name),
+            thread=True,
+            exclusive=True,
+            group="catalog-store",
+            exit_on_error=False,
+        )
+
+    def _reset(self, instance_name) -> None:
+        old_names = set(self.collections)
+        self.instance_name = instance_name
+        self.collections, self.functions, self.tables = {}, {}, {}
+        self._index = {"function": {}, "table": {}}
+        self.refreshed_at = None
+        self.source = None
+        if instance_name is not None:
+            try:
+                self._load_cached(instance_name)
+            except Exception:
+                self.app.session.rollback()
+        new_names = set(self.collections)
+        self._publish(
+            [
+                (
+                    instance_name,
+                    "collection",
+                    None,
+                    sorted(new_names - old_names),
+                    sorted(old_names - new_names),
+                )
+            ]
+        )
+
+    def _load_cached(self, instance_name) -> None:
+        session = self.app.session
+        names = session.execute(
+            select(Collection.name).where(Collection.instance_name == instance_name)
+        ).scalars()
+        self.collections = {name: CachedCollection(name) for name in names}
+        for model, item, store, kind in (
+            (Function, CachedFunction, self.functions, "function"),
+            (Table, CachedTable, self.tables, "table"),
+        ):
+            rows = session.execute(
+                select(model.collection_name, model.name)
+                .where(model.instance_name == instance_name)
+                .order_by(model.collection_name, model.name)
+            ).tuples()
+            for collection, name in rows:
+                parent = self.collections.get(collection) or CachedCollection(collection)
+                store.setdefault(collection, []).append(item(name, parent))
+                self._index_update(kind, collection, added=(name,))
+        self.refreshed_at = session.execute(
+            select(Instance.catalog_synced_at).where(Instance.name == instance_name)
+        ).scalar()
+        self.source = CACHED
+
+    def _load(self, server, instance_name) -> None:
+        result = None
+        try:
+            result = self._fetch(server, instance_name)
+        finally:
+            try:
+                self.app.call_from_thread(self._finish, instance_name, result)
+            except RuntimeError:
+                pass
+
+    def _fetch(self, server, instance_name):
+        collections = tabsdata_api.pull_collections_from_server(server)
+        if collections is None:
+            return None
+        data = {c.name: {} for c in collections}
+        for collection, kind, items in tabsdata_api.fetch_catalog(server, list(data)):
+            data[collection][kind] = items
+
+        registry = worker_sessions(self.app.session.get_bind())
+        try:
+            session = registry()
+            changed = tabsdata_api.apply_catalog_diff(session, instance_name, data)
+            _stamp_sync(session, instance_name, changed)
+        except Exception as exc:
+            # The live catalog is still served from memory; only the copy
+            # kept for the next start (and its sync stamp) is not updated.
+            self.app.log.error(
+                f"Could not store the catalog of {instance_name!r}: {exc!r}"
+            )
+        finally:
+            registry.remove()
+
+        return {c.name: c for c in collections}, data
+
+    def _finish(self, instance_name, result) -> None:
+        if self._loading == instance_name:
+            self._loading = None
+        if result is not None:
+            self._apply(instance_name, *result)
+
+    def _apply(self, instance_name, collections, data) -> None:
+        if instance_name != self.instance_name:
+            return
+        changes = []
+
+        added = sorted(set(collections) - set(self.collections))
+        removed = sorted(set(self.collections) - set(collections))
+        if added or removed or self.source != LIVE:
+            # Going from cached to live rows is a change even if names match.
+            changes.append((instance_name, "collection", None, added, removed))
+
+        for kind, store in (("function", self.functions), ("table", self.tables)):
+            key = f"{kind}s"
+            new_store = {}
+            for name in collections:
+                items = data.get(name, {}).get(key)
+                # A failed call keeps what we had for that collection.
+                new_store[name] = store.get(name, []) if items is None else items
+            for name in sorted(set(new_store) | set(store)):
+                old_names = _names(store.get(name))
+                new_names = _names(new_store.get(name))
+                if old_names != new_names:
+                    self._index_update(
+                        kind,
+                        name,
+                        added=new_names - old_names,
+                        removed=old_names - new_names,
+                    )
+                    changes.append(
+                        (
+                            instance_name,
+                            kind,
+                            name,
+                            sorted(new_names - old_names),
+                            sorted(old_names - new_names),
+                        )
+                    )
+            store.clear()
+            store.update(new_store)
+
+        self.collections = collections
+        self.refreshed_at = time.time()
+        self.source = LIVE
+        self._publish(changes)
+
+
+def _stamp_sync(session, instance_name, changed: bool) -> None:
+    instance = session.get(Instance, instance_name)
+    if instance is None:
+        return
+    now = time.time()
+    stamped = instance.catalog_synced_at
+    if changed or stamped is None or now - stamped >= CATALOG_STAMP_INTERVAL:
+        instance.catalog_synced_at = now
+        session.commit()
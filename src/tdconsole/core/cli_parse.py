@@ -0,0 +1,164 @@
+from dataclasses import dataclass
+
+VALUE_PARAMETERS = ("--coll", "--name", "--instance")
+WHITESPACE = " \t\r\n"
+# Characters a backslash escapes inside double quotes (POSIX shlex).
+DOUBLE_QUOTE_ESCAPES = '\\"'
+
+
+class _Lexer:
+    """
+    Resumable POSIX shell tokenizer producing the same tokens as
+    shlex.split. Feeding it the characters appended to the text continues
+    where the previous call stopped instead of re-reading the whole line.
+    """
+
+    __slots__ = ("tokens", "_buffer", "_in_token", "_quote", "_escape")
+
+    def __init__(self):
+        self.tokens: list[str] = []
+        self._buffer: list[str] = []
+        self._in_token = False
+        self._quote = None
+        self._escape = False
+
+    def feed(self, chars: str) -> None:
+        tokens, buffer = self.tokens, self._buffer
+        for char in chars:
+            if self._escape:
+                self._escape = False
+                if self._quote == '"' and char not in DOUBLE_QUOTE_ESCAPES:
+                    buffer.append("\\")
+                buffer.append(char)
+            elif self._quote == "'":
+                if char == "'":
+                    self._quote = None
+                else:
+                    buffer.append(char)
+            elif self._quote == '"':
+                if char == '"':
+                    self._quote = None
+                elif char == "\\":
+                    self._escape = True
+                else:
+                    buffer.append(char)
+            elif char in WHITESPACE:
+                if self._in_token:
+                    tokens.append("".join(buffer))
+                    buffer.clear()
+                    self._in_token = False
+            else:
+                self._in_token = True
+                if char == "\\":
+                    self._escape = True
+                elif char in "'\"":
+                    self._quote = char
+                else:
+                    buffer.append(char)
+
+    def result(self) -> list[str] | None:
+        """Tokens so far, or None where shlex.split would raise ValueError."""
+        if self._quote is not None or self._escape:
+            return None
+        if self._in_token:
+            return [*self.tokens, "".join(self._buffer)]
+        return list(self.tokens)
+
+
+@dataclass(frozen=True)
+class CommandLine:
+    """
+    Everything the CLI completion needs to know about the input text.
+
+    fragment is the token being typed ("" right after a space);
+    active_parameter is the value option (--coll, --name, --instance) whose
+    value is being typed, if any; scope is "table", "fn" or "tdserver" when
+    the command is one of those.
+    """
+
+    text: str
+    tokens: tuple[str, ...]
+    ends_with_space: bool
+    fragment: str
+    active_parameter: str | None
+    scope: str | None
+    given_flags: frozenset[str]
+    collection_arg: str | None
+    name_arg: str | None
+
+    @property
+    def is_partial(self) -> bool:
+        """True when the last token is still being typed."""
+        return bool(self.tokens) and not self.ends_with_space
+
+
+def _last_value(tokens, option) -> str | None:
+    value = None
+    for index, token in enumerate(tokens[:-1]):
+        if token == option and not tokens[index + 1].startswith("--"):
+            value = tokens[index + 1]
+    return value
+
+
+def _scope(tokens) -> str | None:
+    if len(tokens) < 2:
+        return None
+    if tokens[0] == "tdserver":
+        return "tdserver"
+    if tokens[0] == "td" and tokens[1] in {"table", "fn"}:
+        return tokens[1]
+    return None
+
+
+def build_command_line(text: str, tokens) -> CommandLine:
+    tokens = tuple(tokens)
+    ends_with_space = text.endswith(" ")
+    fragment = "" if ends_with_space or not tokens else tokens[-1]
+    if ends_with_space:
+        previous = tokens[-1] if tokens else None
+    else:
+        previous = tokens[-2] if len(tokens) > 1 else None
+    return CommandLine(
+        text=text,
+        tokens=tokens,
+        ends_with_space=ends_with_space,
+        fragment=fragment,
+        active_parameter=previous if previous in VALUE_PARAMETERS else None,
+        scope=_scope(tokens),
+        given_flags=frozenset(t for t in tokens if t.startswith("--")),
+        collection_arg=_last_value(tokens, "--coll"),
+        name_arg=_last_value(tokens, "--name"),
+    )
+
+
+class CommandLineParser:
+    """
+    Parses the CLI input once per keystroke.
+
+    When the new text extends the previous one, only the appended characters
+    are tokenized; any other edit re-tokenizes from the start. Text that
+    shlex cannot split (an open quote, a trailing backslash) falls back to
+    splitting on spaces.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._lexer = _Lexer()
+        self._line = build_command_line("", ())
+
+    def parse(self, text: str) -> CommandLine:
+        if text == self._text:
+            return self._line
+        if text.startswith(self._text):
+            self._lexer.feed(text[len(self._text) :])
+        else:
+            self._lexer = _Lexer()
+            self._lexer.feed(text)
+        self._text = text
+
+        tokens = self._lexer.result()
+        if tokens is None:
+            tokens = [part for part in text.split(" ") if part]
+        self._line = build_command_line(text, tokens)
+        return self._line
+
@@ -0,0 +1,83 @@
+import importlib
+import os
+from importlib.metadata import PackageNotFoundError, version
+from pathlib import Path
+
+from tdconsole.core.construct_command_trie import Node
+
+# Bump when the layout of generated trees changes so old caches are ignored.
+CLI_TREE_FORMAT = 1
+TD_CLI_ENTRY_POINT = ("tabsdata._cli.cli", "cli")
+
+
+def _cache_path(tabsdata_version: str) -> Path:
+    base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return (
+        base / "tdconsole" / f"td-cli-tree-{tabsdata_version}-v{CLI_TREE_FORMAT}.json"
+    )
+
+
+def click_command_to_node(name: str, command) -> Node:
+    """
+    Build the trie for a Click command (or group) and its subcommands.
+
+    Options that take a value become parameter nodes. Their children are
+    the option's choices when it has any, and a ``__<param>_value__``
+    placeholder otherwise. Flags are plain leaves. Hidden commands and
+    options are skipped.
+    """
+    node = Node(name)
+    for param in getattr(command, "params", []):
+        if getattr(param, "param_type_name", None) != "option" or param.hidden:
+            continue
+        takes_value = not (param.is_flag or param.count)
+        choices = getattr(param.type, "choices", None)
+        for opt in [*param.opts, *param.secondary_opts]:
+            if not takes_value:
+                node.add_child(opt)
+                continue
+            option = node.add_child(Node(opt, parameter=True))
+            values = [str(c) for c in choices] if choices else [f"__{param.name}_value__"]
+            option.add_child([Node(v, parameter_arg=True) for v in values])
+
+    subcommands = getattr(command, "commands", {})
+    for sub_name in sorted(subcommands):
+        subcommand = subcommands[sub_name]
+        if getattr(subcommand, "hidden", False):
+            continue
+        node.add_child(click_command_to_node(sub_name, subcommand))
+    return node
+
+
+def load_td_cli_tree() -> Node | None:
+    """
+    Trie of the ``td`` command shipped with the installed tabsdata.
+
+    The tree is generated from the Click app once per tabsdata version and
+    cached as JSON, so later starts only read the file. Returns None when
+    tabsdata (or its CLI) cannot be imported.
+    """
+    try:
+        tabsdata_version = version("tabsdata")
+    except PackageNotFoundError:
+        return None
+
+    path = _cache_path(tabsdata_version)
+    try:
+        return Node.load(path)
+    except (OSError, ValueError, TypeError):
+        pass
+
+    module_name, attr = TD_CLI_ENTRY_POINT
+    try:
+        cli = getattr(importlib.import_module(module_name), attr)
+    except Exception:
+        return None
+
+    td_node = click_command_to_node("td", cli)
+    try:
+        td_node.dump(path)
+    except OSError:
+        # The cache only saves the next start from importing the CLI.
+        pass
+    return td_node.freeze()
@@ -1,4 +1,8 @@
+import json
+import os
 import shlex
+from bisect import bisect_left
+from pathlib import Path
 
 from textual.app import App, ComposeResult
 from textual.widgets import Input
@@ -7,6 +11,30 @@ from textual_autocomplete._autocomplete import DropdownItem, TargetState
 
 
 class Node:
+    """
+    Command trie node.
+
+    Children are kept in a dict keyed by name (insertion order is the display
+    order) plus a lazily built sorted key array, so exact lookups are O(1)
+    and prefix completion is a bisect. The sorted keys and the visible child
+    names are cached until the node's children change. freeze() builds every
+    cache up front, and dump()/load() write the tree to and read it from JSON.
+    """
+
+    __slots__ = (
+        "name",
+        "parent",
+        "parameter",
+        "parameter_arg",
+        "_children",
+        "_sorted_keys",
+        "_visible_names",
+    )
+
+    # Bits of the flags field in the serialized form.
+    _PARAMETER = 1
+    _PARAMETER_ARG = 2
+
     def __repr__(self):
         return f"{self.name!r}"
         return f"Node(name={self.name!r}, children={self.children})"
@@ -16,17 +44,32 @@ class Node:
     ):
         self.name = name
         self.parent = parent
-        self.children = children if children is not None else []
         self.parameter = parameter
         self.parameter_arg = parameter_arg
+        self._children: dict[str, Node] = {}
+        self._invalidate()
+        for child in children or []:
+            self.add_child(child)
+
+    def _invalidate(self):
+        self._sorted_keys = None
+        self._visible_names = None
+
+    @property
+    def children(self) -> list["Node"]:
+        return list(self._children.values())
 
     def add_child(self, child):
+        # Re-adding a name returns the node already in the trie.
         if isinstance(child, list):
-            child = [self.convert_str_to_node(i) for i in child]
-            self.children.extend(child)
+            child = [
+                self._children.setdefault(node.name, node)
+                for node in map(self.convert_str_to_node, child)
+            ]
         else:
             child = self.convert_str_to_node(child)
-            self.children.append(child)
+            child = self._children.setdefault(child.name, child)
+        self._invalidate()
         return child
 
     def convert_str_to_node(self, child: str):
@@ -38,24 +81,90 @@ class Node:
         return child
 
     def get_child(self, child_name):
-        for i in self.children:
-            if i.name == child_name:
-                return i
-        return None
+        return self._children.get(child_name)
+
+    @property
+    def sorted_keys(self) -> list[str]:
+        if self._sorted_keys is None:
+            self._sorted_keys = sorted(self._children)
+        return self._sorted_keys
+
+    @property
+    def visible_names(self) -> tuple[str, ...]:
+        """Child names in display order, without placeholder (``__x__``) nodes."""
+        if self._visible_names is None:
+            self._visible_names = tuple(
+                name for name in self._children if not name.startswith("__")
+            )
+        return self._visible_names
+
+    def complete(self, prefix: str) -> list[str]:
+        """Visible child names starting with prefix, in display order."""
+        if not prefix:
+            return list(self.visible_names)
+        keys = self.sorted_keys
+        matches = []
+        for index in range(bisect_left(keys, prefix), len(keys)):
+            key = keys[index]
+            if not key.startswith(prefix):
+                break
+            if not key.startswith("__"):
+                matches.append(key)
+        if len(matches) > 1:
+            order = self.visible_names
+            matches.sort(key=order.index)
+        return matches
+
+    def walk(self):
+        """Yield every node below this one, depth first in display order."""
+        stack = list(reversed(self._children.values()))
+        while stack:
+            node = stack.pop()
+            yield node
+            stack.extend(reversed(node._children.values()))
 
     def recur_search(self, name):
-        results = []
-        cursor = self
-        children = cursor.children
-        if len(children) == 0:
-            return []
-        else:
-            for i in children:
-                if i.name == name:
-                    results.append(i)
-                new_search = i.recur_search(name)
-                results.extend(new_search)
-        return results
+        return [node for node in self.walk() if node.name == name]
+
+    def freeze(self):
+        """Build every node's lookup caches now instead of on first use."""
+        for node in (self, *self.walk()):
+            node.sorted_keys
+            node.visible_names
+        return self
+
+    def to_list(self) -> list:
+        flags = (self._PARAMETER if self.parameter else 0) | (
+            self._PARAMETER_ARG if self.parameter_arg else 0
+        )
+        return [self.name, flags, [child.to_list() for child in self.children]]
+
+    @classmethod
+    def from_list(cls, data, parent=None) -> "Node":
+        name, flags, children = data
+        node = cls(
+            name,
+            parent=parent,
+            parameter=bool(flags & cls._PARAMETER),
+            parameter_arg=bool(flags & cls._PARAMETER_ARG),
+        )
+        for child in children:
+            child_node = cls.from_list(child, parent=node)
+            node._children[child_node.name] = child_node
+        return node
+
+    def dump(self, path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_list(), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path) -> "Node":
+        with open(path) as f:
+            return cls.from_list(json.load(f)).freeze()
 
     def get_colls(self):
         return ["a", "b", "c"]
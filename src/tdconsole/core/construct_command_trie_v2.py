@@ -1,12 +1,13 @@
 from dataclasses import dataclass, field
 from typing import Awaitable, Callable, Optional
 
-from tabsdata.api.tabsdata_server import TabsdataServer
 from textual.app import App, ComposeResult
 from textual.widgets import Input
 from textual_autocomplete import AutoComplete
 from textual_autocomplete._autocomplete import DropdownItem, TargetState
 
+from tdconsole.core.tabsdata_api import get_tabsdata_server
+
 ValueProvider = Callable[[], Awaitable[list[str]]]
 import typer
 
@@ -21,7 +22,7 @@ class Node:
         return self.children.get(key)
 
     def construct_collections(self):
-        server = TabsdataServer("127.0.0.1:2457", "admin", "tabsdata", "sys_admin")
+        server = get_tabsdata_server("127.0.0.1:2457")
         collections = server.list_collections()
         collections = [i.name for i in collections]
 
@@ -120,7 +121,7 @@ class DynamicDataApp(App[None]):
         return [DropdownItem(item) for item in items]
 
     def build_cli_trie(self):
-        server = TabsdataServer("127.0.0.1:2457", "admin", "tabsdata", "sys_admin")
+        server = get_tabsdata_server("127.0.0.1:2457")
 
 
 app = typer.Typer(name="td")
@@ -1,11 +1,27 @@
 import os
 from pathlib import Path
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.orm import scoped_session, sessionmaker
 
 from tdconsole.core.find_instances import sync_filesystem_instances_to_db
-from tdconsole.core.models import Base  # your ORM models
+from tdconsole.core.models import SCHEMA_VERSION, Base  # your ORM models
+
+# Several tdconsole processes (and the app's own worker threads) share one
+# SQLite file: WAL lets readers run alongside a writer, and the busy timeout
+# makes writers wait for the lock instead of failing with "database is locked".
+SQLITE_BUSY_TIMEOUT_MS = 10_000
+SQLITE_MMAP_SIZE = 64 * 1024 * 1024
+SQLITE_CACHED_STATEMENTS = 256
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": SQLITE_MMAP_SIZE,
+    "busy_timeout": SQLITE_BUSY_TIMEOUT_MS,
+}
+
+_worker_sessions: dict = {}
+
 
 def _default_db_url() -> str:
     base = Path(os.environ.get("XDG_DATA_HOME", Path.home() / ".local" / "share"))
@@ -54,7 +70,131 @@ def _ensure_sqlite_dir(db_url: str) -> None:
         raise PermissionError(f"Directory not writable: {db_path.parent}")
 
 
-def start_session(db_url: str | None = None):
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+
+def create_db_engine(url: str):
+    """Create the engine, applying the SQLite tuning for sqlite:// URLs."""
+    if not url.startswith("sqlite"):
+        return create_engine(url, echo=False, future=True)
+
+    engine = create_engine(
+        url,
+        echo=False,
+        future=True,
+        connect_args={
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+            "cached_statements": SQLITE_CACHED_STATEMENTS,
+            "check_same_thread": False,
+        },
+    )
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    return engine
+
+
+def worker_sessions(engine) -> scoped_session:
+    """
+    Thread-local session registry for background workers on ``engine``.
+
+    Each thread gets its own session (and so its own connection), separate
+    from the UI session; call ``.remove()`` when the worker is done.
+    """
+    registry = _worker_sessions.get(engine)
+    if registry is None:
+        registry = scoped_session(sessionmaker(bind=engine, future=True))
+        _worker_sessions[engine] = registry
+    return registry
+
+
+# The catalog tables only cache what the server returns, so migrations drop
+# them and let the next sync repopulate them.
+CATALOG_TABLES = ("functions", "tables", "collections")
+INSTANCE_PORT_COLUMNS = ("cfg_ext", "cfg_int", "arg_ext", "arg_int")
+
+
+def _port_to_integer_sql(column: str) -> str:
+    # Older rows store ports as text, sometimes as full "host:port" addresses.
+    port = f"substr({column}, instr({column}, ':') + 1)"
+    return (
+        f"CASE WHEN {port} <> '' AND {port} NOT GLOB '*[^0-9]*' "
+        f"THEN CAST({port} AS INTEGER) END"
+    )
+
+
+def _migrate_to_v1(connection) -> None:
+    """Composite catalog keys and integer instance ports."""
+    for table in CATALOG_TABLES:
+        connection.execute(text(f'DROP TABLE IF EXISTS "{table}"'))
+
+    if not inspect(connection).has_table("instances"):
+        return
+    connection.execute(text("ALTER TABLE instances RENAME TO instances_old"))
+    Base.metadata.tables["instances"].create(connection)
+    old_columns = {c["name"] for c in inspect(connection).get_columns("instances_old")}
+    columns = [c.name for c in Base.metadata.tables["instances"].columns]
+    selected = [
+        _port_to_integer_sql(c) if c in INSTANCE_PORT_COLUMNS else c
+        for c in columns
+        if c in old_columns
+    ]
+    kept = [c for c in columns if c in old_columns]
+    connection.execute(
+        text(
+            f"INSERT INTO instances ({', '.join(kept)}) "
+            f"SELECT {', '.join(selected)} FROM instances_old"
+        )
+    )
+    connection.execute(text("DROP TABLE instances_old"))
+
+
+def _migrate_to_v2(connection) -> None:
+    """Record when each instance's catalog was last synced."""
+    inspector = inspect(connection)
+    if not inspector.has_table("instances"):
+        return
+    columns = {c["name"] for c in inspector.get_columns("instances")}
+    if "catalog_synced_at" not in columns:
+        connection.execute(
+            text("ALTER TABLE instances ADD COLUMN catalog_synced_at FLOAT")
+        )
+
+
+MIGRATIONS = {1: _migrate_to_v1, 2: _migrate_to_v2}
+
+
+def migrate_schema(engine) -> None:
+    """
+    Bring an existing SQLite DB up to models.SCHEMA_VERSION.
+
+    The version lives in PRAGMA user_version. A fresh file is stamped without
+    running migrations since create_all builds the current schema directly.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    with engine.begin() as connection:
+        version = connection.execute(text("PRAGMA user_version")).scalar()
+        if version >= SCHEMA_VERSION:
+            return
+        if inspect(connection).get_table_names():
+            for target in range(version + 1, SCHEMA_VERSION + 1):
+                MIGRATIONS[target](connection)
+        connection.execute(text(f"PRAGMA user_version={SCHEMA_VERSION}"))
+
+
+def start_session(db_url: str | None = None, sync: bool = True):
+    """
+    Open a session on the tdconsole DB, creating tables if needed.
+
+    With sync=False the filesystem reconcile is skipped and the Instance
+    table holds whatever was last written; the caller is expected to refresh
+    it in the background.
+    """
     url = _resolve_db_url(db_url)
     try:
         _ensure_sqlite_dir(url)
@@ -64,11 +204,13 @@ def start_session(db_url: str | None = None):
             "Set TDCONSOLE_DB_URL to a writable location, e.g. "
             "'sqlite:////tmp/tdconsole/tdconsole.db'."
         ) from exc
-    engine = create_engine(url, echo=False, future=True)
+    engine = create_db_engine(url)
+    migrate_schema(engine)
     SessionLocal = sessionmaker(bind=engine, future=True)
     session = SessionLocal()
     Base.metadata.create_all(engine)
-    sync_filesystem_instances_to_db(session=session)
+    if sync:
+        sync_filesystem_instances_to_db(session=session)
     # Base.metadata.drop_all(engine)
     # Base.metadata.create_all(engine)
     return session, Base
@@ -1,14 +1,19 @@
 import json
 import os
-from os import listdir
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
 from urllib.parse import urlparse
 
 import psutil
+from sqlalchemy import inspect, insert, select, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
 from tdconsole.core.models import Instance
 from tdconsole.core.yaml_getter_setter import (
-    get_yaml_value,
+    get_yaml_values,
 )
 
 
@@ -33,23 +38,169 @@ def define_root(*parts):
     return root
 
 
+# Locations of tabsdata.db relative to an instance directory, probed in order
+# before falling back to a bounded scan.
+TABSDATA_DB_CANDIDATES = (
+    "repository/database/tabsdata.db",
+    "workspace/work/proc/regular/apiserver/work/database/tabsdata.db",
+)
+SCAN_MAX_DEPTH = 6
+SCAN_MAX_ENTRIES = 5000
+MANIFEST_VERSION = 1
+
+_manifest_lock = threading.Lock()
+
+
+def _manifest_path() -> Path:
+    base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base / "tdconsole" / "instance_manifest.json"
+
+
+def _empty_manifest() -> dict:
+    return {"version": MANIFEST_VERSION, "root_mtime_ns": None, "instances": {}}
+
+
+def load_instance_manifest() -> dict:
+    try:
+        with open(_manifest_path()) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return _empty_manifest()
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION:
+        return _empty_manifest()
+    manifest.setdefault("instances", {})
+    return manifest
+
+
+def save_instance_manifest(manifest: dict) -> None:
+    path = _manifest_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+    except OSError:
+        # The manifest is only a cache; discovery still works without it.
+        pass
+
+
+def _scan_for_tabsdata_db(instance_dir: Path) -> str | None:
+    """Breadth-first search for tabsdata.db, bounded by depth and entry count."""
+    queue = deque([(instance_dir, 0)])
+    visited = 0
+    while queue:
+        directory, depth = queue.popleft()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    visited += 1
+                    if visited > SCAN_MAX_ENTRIES:
+                        return None
+                    if entry.name == "tabsdata.db" and entry.is_file():
+                        return Path(entry.path).relative_to(instance_dir).as_posix()
+                    if depth < SCAN_MAX_DEPTH and entry.is_dir(follow_symlinks=False):
+                        queue.append((Path(entry.path), depth + 1))
+        except OSError:
+            continue
+    return None
+
+
+def locate_tabsdata_db(instance_dir: Path, hint: str | None = None) -> str | None:
+    """
+    Return the path of tabsdata.db relative to instance_dir, or None.
+    Known locations are checked directly; the directory tree is only walked
+    (with a bound) when none of them exist.
+    """
+    candidates = [hint] if hint else []
+    candidates.extend(c for c in TABSDATA_DB_CANDIDATES if c != hint)
+    for candidate in candidates:
+        if (instance_dir / candidate).is_file():
+            return candidate
+    return _scan_for_tabsdata_db(instance_dir)
+
+
 def find_tabsdata_instance_names():
+    """
+    Return the names of instances under ~/.tabsdata/instances that hold a
+    tabsdata.db. Results are kept in a manifest keyed on directory mtimes, so
+    an instance whose directory has not changed is not probed again.
+    """
     root = define_root("instances")
     matches = []
 
     if root == None:
         return matches
 
-    for i in listdir(root):
-        instance = root / i
-        for current_root, dirs, files in os.walk(instance):
-            if "tabsdata.db" in files:
-                matches.append(i)
-                break
+    with _manifest_lock:
+        manifest = load_instance_manifest()
+        known = manifest["instances"]
+        changed = False
+
+        try:
+            root_mtime_ns = root.stat().st_mtime_ns
+        except OSError:
+            return matches
+
+        if manifest.get("root_mtime_ns") == root_mtime_ns:
+            names = sorted(known)
+        else:
+            try:
+                with os.scandir(root) as entries:
+                    names = sorted(e.name for e in entries if e.is_dir())
+            except OSError:
+                return matches
+            for stale in set(known) - set(names):
+                del known[stale]
+            manifest["root_mtime_ns"] = root_mtime_ns
+            changed = True
+
+        for name in names:
+            instance_dir = root / name
+            try:
+                mtime_ns = instance_dir.stat().st_mtime_ns
+            except OSError:
+                if known.pop(name, None) is not None:
+                    changed = True
+                continue
+
+            entry = known.get(name)
+            if entry and entry.get("mtime_ns") == mtime_ns and entry.get("db_path"):
+                matches.append(name)
+                continue
+
+            hint = entry.get("db_path") if entry else None
+            if entry and entry.get("mtime_ns") == mtime_ns:
+                # Nothing moved at the top level since the last full scan;
+                # the database may still appear deeper, so only re-probe the
+                # known locations.
+                db_path = next(
+                    (
+                        c
+                        for c in TABSDATA_DB_CANDIDATES
+                        if (instance_dir / c).is_file()
+                    ),
+                    None,
+                )
+            else:
+                db_path = locate_tabsdata_db(instance_dir, hint)
+
+            if entry != {"mtime_ns": mtime_ns, "db_path": db_path}:
+                known[name] = {"mtime_ns": mtime_ns, "db_path": db_path}
+                changed = True
+            if db_path is not None:
+                matches.append(name)
+
+        if changed:
+            save_instance_manifest(manifest)
 
     return matches
 
 
+# Grace period between an apiserver starting and it writing its pid file.
+PID_START_TOLERANCE = 5.0
+
+
 def find_instance_pid(instance_name: str):
     pid_path = define_root(
         "instances", instance_name, "/workspace/work/proc/regular/apiserver/work/pid"
@@ -61,53 +212,163 @@ def find_instance_pid(instance_name: str):
     return pid
 
 
-def find_sockets(instance_name: str, pid=None):
+def _pid_file_mtime(instance_name: str):
+    pid_path = define_root(
+        "instances", instance_name, "/workspace/work/proc/regular/apiserver/work/pid"
+    )
+    try:
+        return pid_path.stat().st_mtime if pid_path is not None else None
+    except OSError:
+        return None
+
+
+def _cmdline_arg(cmdline: list[str], flag: str):
+    for index, arg in enumerate(cmdline):
+        if arg == flag and index + 1 < len(cmdline):
+            return cmdline[index + 1]
+        if arg.startswith(f"{flag}="):
+            return arg.split("=", 1)[1]
+    return None
+
+
+# apiserver flags holding a path inside the instance directory, e.g.
+# --ssl-folder ~/.tabsdata/instances/<name>/workspace/config/ssl.
+INSTANCE_PATH_ARGS = ("--ssl-folder", "--database-url")
+
+
+def _instance_from_path(value: str | None):
+    """Instance name from a path (or file:// URL) under .../instances/<name>/."""
+    if not value:
+        return None
+    parts = Path(urlparse(value).path if "://" in value else value).parts
+    if "instances" in parts[:-1]:
+        return parts[parts.index("instances") + 1]
+    return None
+
+
+def _apiserver_instance(cmdline: list[str]):
+    for flag in INSTANCE_PATH_ARGS:
+        instance = _instance_from_path(_cmdline_arg(cmdline, flag))
+        if instance is not None:
+            return instance
+    return None
+
+
+def scan_apiserver_processes() -> list[dict]:
+    """
+    Walk the process table once and return every tabsdata apiserver with the
+    instance it serves and the addresses it was started with, if any. The
+    supervisor normally passes the addresses on stdin; the address keys are
+    None then.
+    """
+    processes = []
+    for proc in psutil.process_iter(["pid", "cmdline", "create_time"]):
+        info = proc.info
+        entry = _apiserver_entry(
+            info["pid"], info.get("cmdline"), info.get("create_time")
+        )
+        if entry is not None:
+            processes.append(entry)
+    return processes
+
+
+def apiserver_process(pid) -> list[dict]:
+    """
+    The apiserver running as pid, in the shape of scan_apiserver_processes,
+    without walking the whole process table. Empty when there is none.
+    """
+    try:
+        proc = psutil.Process(int(pid))
+        entry = _apiserver_entry(proc.pid, proc.cmdline(), proc.create_time())
+    except (psutil.Error, TypeError, ValueError):
+        return []
+    return [] if entry is None else [entry]
+
+
+def _apiserver_entry(pid, cmdline, create_time) -> dict | None:
+    cmdline = cmdline or []
+    if not cmdline or "apiserver" not in Path(cmdline[0]).name:
+        return None
+    return {
+        "pid": pid,
+        "create_time": create_time,
+        "cmdline": cmdline,
+        "instance": _apiserver_instance(cmdline),
+        "address": _cmdline_arg(cmdline, "--address"),
+        "internal_address": _cmdline_arg(cmdline, "--internal-address"),
+    }
+
+
+def match_apiserver_process(
+    instance_name: str, processes: list[dict], pid=None, pid_mtime=None
+):
+    """
+    Pick the apiserver process serving instance_name out of a process scan.
+
+    A pid from the pid file only counts if that process started before the pid
+    file was written, so a recycled pid is never reported as running.
+    """
+    try:
+        pid = int(pid) if pid is not None else None
+    except ValueError:
+        pid = None
+
+    if pid is not None:
+        for proc in processes:
+            if proc["pid"] != pid:
+                continue
+            if proc["instance"] not in (None, instance_name):
+                break
+            started = proc["create_time"]
+            if pid_mtime is None or started <= pid_mtime + PID_START_TOLERANCE:
+                return proc
+            break
+
+    owned = [proc for proc in processes if proc["instance"] == instance_name]
+    if owned:
+        return max(owned, key=lambda proc: proc["create_time"] or 0)
+    return None
+
+
+def find_sockets(instance_name: str, pid=None, processes=None):
+    """
+    Status, pid and sockets of one instance. Without ``processes`` only the
+    pid is checked; pass a scan_apiserver_processes() result to also find a
+    server whose pid file is missing or stale.
+    """
     cfg_path = define_root(
         "instances",
         instance_name,
         "/workspace/config/proc/regular/apiserver/config/config.yaml",
     )
-    cfg_ext = get_yaml_value(path=cfg_path, key="addresses")
-    cfg_int = get_yaml_value(path=cfg_path, key="internal_addresses")
+    cfg = get_yaml_values(path=cfg_path, keys=["addresses", "internal_addresses"])
+    cfg_ext = cfg["addresses"]
+    cfg_int = cfg["internal_addresses"]
     arg_ext = cfg_ext
     arg_int = cfg_int
     status = "Not Running"
 
     # if no arg is passed, try to find pid
+    pid_mtime = None
     if pid == None:
         pid = find_instance_pid(instance_name)
+        pid_mtime = _pid_file_mtime(instance_name)
 
-    # if no pid then assume server not running
-    if pid == None:
-        return {
-            "cfg_ext": cfg_ext,
-            "cfg_int": cfg_int,
-            "arg_ext": arg_ext,
-            "arg_int": arg_int,
-            "status": status,
-        }
-    else:
-        # if no process, then not running
-        try:
-            p = psutil.Process(int(pid)).cmdline()
-            status = "Running"
-        except:
-            pass
+    if processes is None:
+        processes = apiserver_process(pid) if pid is not None else []
 
-        # if no arg assume running external socket same as config
-        try:
-            arg_ext = p[p.index("--address") + 1]
-        except:
-            pass
+    process = match_apiserver_process(instance_name, processes, pid, pid_mtime)
 
-        # if no arg assume running internal socket same as config
-        try:
-            arg_int = p[p.index("--internal-address") + 1]
-        except:
-            pass
+    if process is not None:
+        status = "Running"
+        pid = str(process["pid"])
+        # if no arg assume running sockets same as config
+        arg_ext = process["address"] or arg_ext
+        arg_int = process["internal_address"] or arg_int
 
     return {
         "status": status,
+        "pid": pid,
         "cfg_ext": cfg_ext,
         "cfg_int": cfg_int,
         "arg_ext": arg_ext,
@@ -115,39 +376,50 @@ def find_sockets(instance_name: str, pid=None):
     }
 
 
-def instance_name_to_instance(instance_name: str) -> Instance:
+def address_port(address) -> int | None:
+    """Port of a "host:port" address (or a bare port) as an int."""
+    if address is None:
+        return None
+    port = str(address).rsplit(":", 1)[-1]
+    return int(port) if port.isdigit() else None
+
+
+def instance_name_to_instance(instance_name: str, processes=None) -> Instance:
     """
     Build an Instance ORM object from filesystem state only.
     Does NOT interact with the database.
+    Pass `processes` from scan_apiserver_processes() to reuse one process scan.
     """
-    available_instances = find_tabsdata_instance_names()
-    if instance_name not in available_instances and instance_name == "_Create_Instance":
+    if (
+        instance_name == "_Create_Instance"
+        and instance_name not in find_tabsdata_instance_names()
+    ):
         return Instance(
             name=instance_name,
             status="Not Created",
-            cfg_ext="2457",
-            cfg_int="2458",
-            arg_ext="2457",
-            arg_int="2458",
+            cfg_ext=2457,
+            cfg_int=2458,
+            arg_ext=2457,
+            arg_int=2458,
             public_ip="127.0.0.1",
             private_ip="127.0.0.1",
         )
 
-    pid = find_instance_pid(instance_name)
-    sockets = find_sockets(instance_name, pid)
+    sockets = find_sockets(instance_name, processes=processes)
+    pid = sockets["pid"]
     split_public_socket = sockets["arg_ext"].split(":")
     split_private_socket = sockets["arg_int"].split(":")
     public_ip = split_public_socket[0]
-    public_port = split_public_socket[-1]
+    public_port = address_port(sockets["arg_ext"])
     private_ip = split_private_socket[0]
-    private_port = split_private_socket[-1]
+    private_port = address_port(sockets["arg_int"])
 
     return Instance(
         name=instance_name,
         pid=pid,
         status=sockets["status"],
-        cfg_ext=sockets["cfg_ext"].split(":")[-1],
-        cfg_int=sockets["cfg_int"].split(":")[-1],
+        cfg_ext=address_port(sockets["cfg_ext"]),
+        cfg_int=address_port(sockets["cfg_int"]),
         arg_ext=public_port,
         arg_int=private_port,
         public_ip=public_ip,
@@ -184,9 +456,81 @@ def resolve_working_instance(app=None, session=None):
     return working_instance
 
 
+SYNC_MAX_WORKERS = 8
+
+
+def probe_instances(instance_names, processes=None) -> list[dict]:
+    """
+    Build the column values of each instance from the filesystem, probing
+    instances concurrently on a bounded thread pool. All probes share one
+    process table scan.
+    """
+    instance_names = list(instance_names)
+    if not instance_names:
+        return []
+    if processes is None:
+        processes = apiserver_process(pid) if pid is not None else []
+
+    workers = min(SYNC_MAX_WORKERS, len(instance_names))
+    probe = partial(instance_name_to_instance, processes=processes)
+    with ThreadPoolExecutor(
+        max_workers=workers, thread_name_prefix="tdconsole-probe"
+    ) as pool:
+        instances = list(pool.map(probe, instance_names))
+
+    column_keys = {column.key for column in Instance.__table__.columns}
+    return [
+        {
+            key: value
+            for key, value in inspect(instance).dict.items()
+            if key in column_keys
+        }
+        for instance in instances
+    ]
+
+
+def upsert_instances(session, rows: list[dict], update_working: bool = True) -> None:
+    """
+    Write probed instance rows in bulk. On SQLite this is a single
+    INSERT ... ON CONFLICT; elsewhere one bulk INSERT for new names and one
+    bulk UPDATE for existing ones. Columns the probe did not set (use_https)
+    are left untouched on existing rows.
+    """
+    if not rows:
+        return
+
+    preserved = {"name"} if update_working else {"name", "working"}
+    if session.get_bind().dialect.name == "sqlite":
+        stmt = sqlite_insert(Instance).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Instance.name],
+            set_={
+                key: stmt.excluded[key] for key in rows[0] if key not in preserved
+            },
+        )
+        session.execute(stmt)
+        return
+
+    names = [row["name"] for row in rows]
+    existing = set(
+        session.scalars(select(Instance.name).where(Instance.name.in_(names)))
+    )
+    new_rows = [row for row in rows if row["name"] not in existing]
+    changed_rows = [
+        {key: value for key, value in row.items() if key not in preserved - {"name"}}
+        for row in rows
+        if row["name"] in existing
+    ]
+    if new_rows:
+        session.execute(insert(Instance), new_rows)
+    if changed_rows:
+        session.execute(update(Instance), changed_rows)
+
+
 def sync_filesystem_instances_to_db(app=None, session=None) -> list[Instance]:
     """
-    Sync filesystem state into the DB using ORM models created by instance_name_to_instance.
+    Sync filesystem state into the DB.
+    Instances are probed concurrently, then written with one bulk upsert.
     Returns the ORM models from the DB after upsert.
     """
     if session is not None:
@@ -199,27 +543,18 @@ def sync_filesystem_instances_to_db(app=None, session=None) -> list[Instance]:
     instance_names = find_tabsdata_instance_names()
 
     working_instance = resolve_working_instance(app, session)
+    working_name = getattr(working_instance, "name", None)
 
-    for name in instance_names:
-        # Instance from filesystem only
-        fs_instance = instance_name_to_instance(name)
-        if working_instance is not None and fs_instance.name == working_instance.name:
-            fs_instance.working = True
-        else:
-            fs_instance.working = False
-
-        # Try to find existing record in DB
-        db_instance = session.query(Instance).filter_by(name=name).first()
-
-        if db_instance is None:
-            # Create if not found
-            session.add(fs_instance)
-        else:
-            session.merge(fs_instance)
+    rows = probe_instances(instance_names)
+    for row in rows:
+        row["working"] = row["name"] == working_name
 
+    upsert_instances(session, rows)
     session.query(Instance).filter(~Instance.name.in_(instance_names)).delete(
         synchronize_session=False
     )
+    session.commit()
+
     if hasattr(app, "working_instance"):
         working_instance = app.working_instance
         if hasattr(working_instance, "name"):
@@ -227,17 +562,67 @@ def sync_filesystem_instances_to_db(app=None, session=None) -> list[Instance]:
             db_instance = (
                 session.query(Instance).filter_by(name=working_instance_name).first()
             )
-            if db_instance.status == "Not Running":
+            if db_instance is None or db_instance.status == "Not Running":
                 app.working_instance = None
 
-    session.commit()
-
     # Return database versions of instances
     instances_in_db = session.query(Instance).order_by(Instance.name).all()
 
     return instances_in_db
 
 
+def sync_instances_to_db(instance_names, session) -> None:
+    """
+    Incrementally refresh the given instances from the filesystem.
+    Names that no longer exist on disk are removed; the working flag of
+    existing rows is preserved.
+    """
+    live_names = set(find_tabsdata_instance_names())
+    present = [name for name in instance_names if name in live_names]
+    missing = [name for name in instance_names if name not in live_names]
+
+    rows = probe_instances(present)
+    for row in rows:
+        row["working"] = False
+
+    upsert_instances(session, rows, update_working=False)
+    if missing:
+        session.query(Instance).filter(Instance.name.in_(missing)).delete(
+            synchronize_session=False
+        )
+    session.commit()
+
+
+def watcher_active(app) -> bool:
+    watcher = getattr(app, "instance_watcher", None)
+    return watcher is not None and watcher.is_alive()
+
+
+def list_instances(app=None, session=None) -> list[Instance]:
+    """
+    Return all instances. When the app has a live instance watcher the DB is
+    already current, so this is a plain query. Otherwise an app that can
+    sync in the background is asked to (and the rows it has are returned
+    meanwhile); without one the filesystem is synced first.
+    """
+    if session is not None:
+        pass
+    elif hasattr(app, "session"):
+        session = app.session
+    else:
+        raise TypeError("Expected either an app or session to be provided")
+
+    if not watcher_active(app):
+        request_sync = getattr(app, "request_instance_sync", None)
+        if request_sync is None:
+            return sync_filesystem_instances_to_db(app, session)
+        request_sync()
+
+    return (
+        session.query(Instance).populate_existing().order_by(Instance.name).all()
+    )
+
+
 def query_session(session, model, limit=None, *conditions, **filters):
     query = session.query(model)
     if filters:
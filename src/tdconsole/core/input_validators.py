@@ -1,8 +1,14 @@
-from tabsdata.api.tabsdata_server import Collection, TabsdataServer
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
 from textual.validation import ValidationResult, Validator
 
 from tdconsole.textual_assets import textual_instance_config
 
+if TYPE_CHECKING:
+    from tabsdata.api.tabsdata_server import Collection, TabsdataServer
+
 
 class ValidInstanceName(Validator):
     def __init__(self, app, instance, failure_description: str | None = None):
@@ -31,9 +37,7 @@ class ValidCollectionName(Validator):
     def validate(self, value: str) -> ValidationResult:
         if value == "":
             return self.failure("Your Collection Name Cannot be Empty")
-        server: TabsdataServer = self.server
-        collections = server.list_collections()
-        collection_names = [i.name for i in collections]
+        collection_names = self.app.catalog_store.collection_names()
 
         if value in collection_names:
             return self.failure(f"The collection with name {value} already exists")
@@ -75,7 +79,7 @@ class PlaeholderValidator(Validator):
 
 class ValidIntPort(ValidExtPort):
     def validate(self, value: int) -> ValidationResult:
-        if value == self.instance.arg_ext:
+        if str(value) == str(self.instance.arg_ext):
             return self.failure(
                 "Internal port must not be the same as external port. "
                 "Please choose another port."
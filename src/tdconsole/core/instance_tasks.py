@@ -1,11 +1,16 @@
 # tdconsole/core/tasks/instance_tasks.py
 
+import importlib.metadata
 from pathlib import Path
 
-import tabsdata as td
 from packaging.version import Version
 
-from tdconsole.core.yaml_getter_setter import get_yaml_value, set_yaml_value
+from tdconsole.core.tabsdata_api import forget_tabsdata_server
+from tdconsole.core.yaml_getter_setter import (
+    get_yaml_value,
+    set_in_document,
+    yaml_edit,
+)
 
 # ------------------------------------------------------------
 # Low level instance operations
@@ -23,6 +28,8 @@ async def stop_instance(runner, instance, label=None) -> int:
         instance.name,
     )
     runner.log_line(label, f"Stop command exited with code {code}")
+    # Tokens issued by the stopped server are not valid after a restart.
+    forget_tabsdata_server(instance.ext_socket)
     return code
 
 
@@ -102,7 +109,9 @@ async def upgrade_instance(runner, instance, label=None) -> int:
     instance_version = get_yaml_value(version_path, "version")
     if instance_version is None:
         return 0
-    tabsdata_version = td.__version__
+    # Read from the installed distribution; importing tabsdata just for
+    # __version__ is expensive.
+    tabsdata_version = importlib.metadata.version("tabsdata")
 
     runner.log_line(
         label,
@@ -187,25 +196,32 @@ async def bind_ports(runner, instance, label=None) -> None:
 
     runner.log_line(label, f"Updating port config at {config_path}")
 
-    # external
+    updates = {}
     if runner.new["arg_ext"] is True:
-        cfg_ext = set_yaml_value(
-            path=config_path,
-            key="addresses",
-            value=f"127.0.0.1:{instance.arg_ext}",
-            value_type="list",
-        )
-        runner.log_line(label, f"Set external port -> {cfg_ext}")
+        updates["addresses"] = f"127.0.0.1:{instance.arg_ext}"
+    if runner.new["arg_int"] is True:
+        updates["internal_addresses"] = f"127.0.0.1:{instance.arg_int}"
+    if not updates:
+        return
+
+    # One parse and one atomic write for every changed key.
+    try:
+        with yaml_edit(config_path) as config:
+            for key, value in updates.items():
+                set_in_document(config, key, value, "list")
+    except Exception as exc:
+        runner.log_line(label, f"Failed to update port config: {exc!r}")
+        return
+
+    # external
+    if "addresses" in updates:
+        runner.log_line(label, f"Set external port -> {updates['addresses']}")
 
     # internal
-    if runner.new["arg_int"] is True:
-        cfg_int = set_yaml_value(
-            path=config_path,
-            key="internal_addresses",
-            value=f"127.0.0.1:{instance.arg_int}",
-            value_type="list",
+    if "internal_addresses" in updates:
+        runner.log_line(
+            label, f"Set internal port -> {updates['internal_addresses']}"
         )
-        runner.log_line(label, f"Set internal port -> {cfg_int}")
 
 
 # ------------------------------------------------------------
@@ -0,0 +1,321 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+from pathlib import Path
+
+from tdconsole.core.find_instances import (
+    define_root,
+    find_tabsdata_instance_names,
+    sync_filesystem_instances_to_db,
+    sync_instances_to_db,
+)
+from tdconsole.core.models import Instance
+from tdconsole.core.tabsdata_api import forget_tabsdata_server
+
+PID_DIR = "workspace/work/proc/regular/apiserver/work"
+PID_FILE = "pid"
+CONFIG_DIR = "workspace/config/proc/regular/apiserver/config"
+CONFIG_FILE = "config.yaml"
+
+# inotify(7) event masks
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+DIR_MASK = IN_CREATE | IN_DELETE | IN_MOVED_FROM | IN_MOVED_TO | IN_ONLYDIR
+FILE_MASK = DIR_MASK | IN_MODIFY | IN_CLOSE_WRITE | IN_ATTRIB | IN_DELETE_SELF
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+# Marker in a change set asking for a full filesystem reconcile.
+FULL_RESYNC = None
+
+
+def _load_inotify():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        libc.inotify_init1
+        libc.inotify_add_watch
+        libc.inotify_rm_watch
+    except (OSError, AttributeError):
+        return None
+    return libc
+
+
+class InstanceWatcher(threading.Thread):
+    """
+    Background thread that keeps the Instance table in step with
+    ~/.tabsdata/instances.
+
+    On Linux it subscribes to inotify events on the instances directory and
+    on each instance's apiserver pid and config.yaml directories; elsewhere it
+    falls back to polling their mtimes. Only the instances touched by an event
+    are re-read and written to the DB, using a session of its own.
+
+    on_ready is called once, after the initial full reconcile, whether or not
+    any instance changed; on_change is called with the names of the
+    instances rewritten by each pass.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        on_change=None,
+        on_ready=None,
+        poll_interval: float = 1.0,
+        debounce: float = 0.2,
+    ):
+        super().__init__(name="tdconsole-instance-watcher", daemon=True)
+        self.session_factory = session_factory
+        self.on_change = on_change
+        self.on_ready = on_ready
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._stop_event = threading.Event()
+        self._wake_r, self._wake_w = os.pipe()
+        self._libc = _load_inotify()
+        self._fd = None
+        self._watches: dict[int, tuple[str, str | None]] = {}
+        self._watched_paths: dict[Path, int] = {}
+        self._snapshot: dict[str, tuple] = {}
+
+    # ------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        try:
+            os.write(self._wake_w, b"x")
+        except OSError:
+            pass
+
+    def run(self) -> None:
+        if self._libc is not None:
+            fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+            self._fd = fd if fd >= 0 else None
+
+        session = self.session_factory()
+        try:
+            self._refresh_watches()
+            self._snapshot = self._take_snapshot()
+            # Close the gap between the initial sync and the first watch.
+            before = self._running_servers(session)
+            try:
+                sync_filesystem_instances_to_db(session=session)
+            except Exception:
+                session.rollback()
+            else:
+                self._forget_restarted(before, self._running_servers(session))
+            self._notify(set(self._snapshot))
+            self._notify_ready()
+
+            while not self._stop_event.is_set():
+                changed = self._wait_for_changes()
+                if changed and not self._stop_event.is_set():
+                    self._apply(session, changed)
+        finally:
+            session.close()
+            remove = getattr(self.session_factory, "remove", None)
+            if remove is not None:
+                remove()
+            if self._fd is not None:
+                os.close(self._fd)
+            os.close(self._wake_r)
+            os.close(self._wake_w)
+
+    # ------------------------------------------------------------
+    # Event collection
+    # ------------------------------------------------------------
+
+    def _wait_for_changes(self) -> set[str]:
+        if self._fd is None:
+            # No inotify: poll. select() only takes sockets on Windows, so
+            # the stop event is what wakes this wait early.
+            self._stop_event.wait(self.poll_interval)
+            return self._diff_snapshot()
+
+        ready, _, _ = select.select(
+            [self._wake_r, self._fd], [], [], self.poll_interval
+        )
+        if self._fd not in ready:
+            # Directories that did not exist at the last pass (e.g. a pid dir
+            # created by a first start) get picked up here.
+            return self._refresh_watches()
+
+        # Let bursts of writes (tdserver start touches several files) settle.
+        self._stop_event.wait(self.debounce)
+        changed = self._read_events()
+        changed |= self._refresh_watches()
+        return changed
+
+    def _read_events(self) -> set[str]:
+        changed: set[str] = set()
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            if not data:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                raw_name = data[offset : offset + length].rstrip(b"\0")
+                offset += length
+                changed |= self._handle_event(wd, mask, os.fsdecode(raw_name))
+        return changed
+
+    def _handle_event(self, wd: int, mask: int, name: str) -> set[str]:
+        if mask & IN_Q_OVERFLOW:
+            # Events were dropped; fall back to a full reconcile.
+            return {FULL_RESYNC}
+
+        kind, instance = self._watches.get(wd, (None, None))
+        if mask & IN_IGNORED:
+            self._forget_watch(wd)
+        if kind == "root":
+            return {name} if name else set()
+        if kind == "pid" and (name == PID_FILE or not name):
+            return {instance}
+        if kind == "config" and (name == CONFIG_FILE or not name):
+            return {instance}
+        return set()
+
+    # ------------------------------------------------------------
+    # Watch bookkeeping
+    # ------------------------------------------------------------
+
+    def _add_watch(self, path: Path, kind: str, instance: str | None) -> bool:
+        if path in self._watched_paths or not path.is_dir():
+            return False
+        mask = DIR_MASK if kind == "root" else FILE_MASK
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), mask)
+        if wd < 0:
+            return False
+        self._watches[wd] = (kind, instance)
+        self._watched_paths[path] = wd
+        return True
+
+    def _forget_watch(self, wd: int) -> None:
+        self._watches.pop(wd, None)
+        for path, path_wd in list(self._watched_paths.items()):
+            if path_wd == wd:
+                del self._watched_paths[path]
+
+    def _refresh_watches(self) -> set[str]:
+        """Watch any instance directories that appeared since the last pass."""
+        if self._fd is None:
+            return set()
+        root = define_root("instances")
+        if root is None:
+            return set()
+
+        self._add_watch(root, "root", None)
+        newly_watched: set[str] = set()
+        for name in find_tabsdata_instance_names():
+            instance_dir = root / name
+            if self._add_watch(instance_dir / PID_DIR, "pid", name):
+                newly_watched.add(name)
+            if self._add_watch(instance_dir / CONFIG_DIR, "config", name):
+                newly_watched.add(name)
+        return newly_watched
+
+    # ------------------------------------------------------------
+    # Polling fallback
+    # ------------------------------------------------------------
+
+    def _take_snapshot(self) -> dict[str, tuple]:
+        root = define_root("instances")
+        if root is None:
+            return {}
+        snapshot = {}
+        for name in find_tabsdata_instance_names():
+            instance_dir = root / name
+            snapshot[name] = (
+                _mtime_ns(instance_dir / PID_DIR / PID_FILE),
+                _mtime_ns(instance_dir / CONFIG_DIR / CONFIG_FILE),
+            )
+        return snapshot
+
+    def _diff_snapshot(self) -> set[str]:
+        current = self._take_snapshot()
+        previous = self._snapshot
+        self._snapshot = current
+        names = set(current) | set(previous)
+        return {name for name in names if current.get(name) != previous.get(name)}
+
+    # ------------------------------------------------------------
+    # Applying changes
+    # ------------------------------------------------------------
+
+    def _apply(self, session, changed: set[str]) -> None:
+        before = self._running_servers(session)
+        try:
+            if FULL_RESYNC in changed:
+                instances = sync_filesystem_instances_to_db(session=session)
+                changed = {instance.name for instance in instances}
+            else:
+                sync_instances_to_db(sorted(changed), session)
+        except Exception:
+            session.rollback()
+            return
+        self._forget_restarted(before, self._running_servers(session))
+        self._notify(changed)
+
+    def _running_servers(self, session) -> dict[str, tuple]:
+        """{instance name: (pid, ext_socket)} for instances with a pid."""
+        try:
+            rows = session.query(
+                Instance.name, Instance.pid, Instance.ext_socket
+            ).filter(Instance.pid.is_not(None))
+            return {name: (pid, socket) for name, pid, socket in rows}
+        except Exception:
+            session.rollback()
+            return {}
+
+    def _forget_restarted(self, before: dict, after: dict) -> None:
+        # A new apiserver process does not accept the old one's tokens.
+        for name, (pid, socket) in before.items():
+            if after.get(name, (None, None))[0] != pid:
+                forget_tabsdata_server(socket)
+
+    def _notify(self, changed: set[str]) -> None:
+        if self.on_change is None or not changed:
+            return
+        try:
+            self.on_change(changed)
+        except Exception:
+            pass
+
+    def _notify_ready(self) -> None:
+        if self.on_ready is None:
+            return
+        try:
+            self.on_ready()
+        except Exception:
+            pass
+
+
+def _mtime_ns(path: Path):
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
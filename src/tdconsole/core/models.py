@@ -1,9 +1,22 @@
-from sqlalchemy import Boolean, Column, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Float,
+    ForeignKey,
+    ForeignKeyConstraint,
+    Index,
+    Integer,
+    String,
+)
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import declarative_base, relationship
 
 Base = declarative_base()
 
+# Bumped whenever a table changes shape; db.migrate_schema compares it with
+# SQLite's PRAGMA user_version.
+SCHEMA_VERSION = 2
+
 
 class Instance(Base):
     __tablename__ = "instances"
@@ -13,13 +26,15 @@ class Instance(Base):
     pid = Column(String, nullable=True, default=None)
     working = Column(Boolean, nullable=False, default=False)
     status = Column(String, nullable=False, default="Not Running")
-    cfg_ext = Column(String, nullable=True, default="2457")
-    cfg_int = Column(String, nullable=True, default="2458")
-    arg_ext = Column(String, nullable=True, default="2457")
-    arg_int = Column(String, nullable=True, default="2458")
+    cfg_ext = Column(Integer, nullable=True, default=2457, index=True)
+    cfg_int = Column(Integer, nullable=True, default=2458, index=True)
+    arg_ext = Column(Integer, nullable=True, default=2457, index=True)
+    arg_int = Column(Integer, nullable=True, default=2458, index=True)
     private_ip = Column(String, nullable=True, default="127.0.0.1")
     public_ip = Column(String, nullable=True, default="127.0.0.1")
     use_https = Column(Boolean, nullable=True, default=False)
+    # Epoch seconds of the last catalog sync from the server.
+    catalog_synced_at = Column(Float, nullable=True, default=None)
 
     collections = relationship(
         "Collection",
@@ -46,6 +61,7 @@ class Instance(Base):
 
 class Collection(Base):
     __tablename__ = "collections"
+    __table_args__ = (Index("ix_collections_instance_name", "instance_name", "name"),)
 
     name = Column(String, nullable=True, primary_key=True)
 
@@ -68,10 +84,21 @@ class Collection(Base):
 
 class Function(Base):
     __tablename__ = "functions"
-
-    collection_name = Column(
-        String, ForeignKey("collections.name"), nullable=False, primary_key=True
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["collection_name", "instance_name"],
+            ["collections.name", "collections.instance_name"],
+        ),
+        Index(
+            "ix_functions_instance_collection_name",
+            "instance_name",
+            "collection_name",
+            "name",
+        ),
+        Index("ix_functions_instance_name", "instance_name", "name"),
     )
+
+    collection_name = Column(String, nullable=False, primary_key=True)
     collection = relationship("Collection", back_populates="functions")
     instance_name = Column(String, primary_key=True)
 
@@ -80,10 +107,21 @@ class Function(Base):
 
 class Table(Base):
     __tablename__ = "tables"
-
-    collection_name = Column(
-        String, ForeignKey("collections.name"), nullable=False, primary_key=True
+    __table_args__ = (
+        ForeignKeyConstraint(
+            ["collection_name", "instance_name"],
+            ["collections.name", "collections.instance_name"],
+        ),
+        Index(
+            "ix_tables_instance_collection_name",
+            "instance_name",
+            "collection_name",
+            "name",
+        ),
+        Index("ix_tables_instance_name", "instance_name", "name"),
     )
+
+    collection_name = Column(String, nullable=False, primary_key=True)
     collection = relationship("Collection", back_populates="tables")
     instance_name = Column(String, primary_key=True)
 
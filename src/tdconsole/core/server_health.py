@@ -0,0 +1,204 @@
+import threading
+import time
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+FAILURE_THRESHOLD = 3
+BACKOFF_SECONDS = 5.0
+MAX_BACKOFF_SECONDS = 60.0
+
+
+class ServerUnavailable(Exception):
+    """Raised instead of calling a server whose circuit is open."""
+
+
+def _exception_chain(exc: BaseException):
+    """exc followed by its __cause__/__context__ chain, each error once."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        seen.add(id(exc))
+        yield exc
+        exc = exc.__cause__ or exc.__context__
+
+
+def is_unreachable_error(exc: BaseException) -> bool:
+    """
+    True for errors meaning the server could not be reached at all, also
+    when tabsdata re-raised them as another error. HTTP error responses
+    prove the server is up and do not count.
+    """
+    try:
+        import requests
+    except ImportError:
+        requests = None
+    unreachable = (ServerUnavailable, ConnectionError, TimeoutError)
+    if requests is not None:
+        unreachable += (
+            requests.exceptions.ConnectionError,
+            requests.exceptions.Timeout,
+        )
+    return any(isinstance(error, unreachable) for error in _exception_chain(exc))
+
+
+AUTH_ERROR_MARKERS = ("unauthorized", "unauthenticated", "invalid_token", "expired")
+
+
+def is_authentication_error(exc: BaseException) -> bool:
+    """
+    True when the server rejected the client's credentials (HTTP 401).
+
+    APIServerError drops the status code but is raised while handling the
+    requests HTTPError, so the chained error still carries the response;
+    its code and error fields are checked as well.
+    """
+    for error in _exception_chain(exc):
+        response = getattr(error, "response", None)
+        if getattr(response, "status_code", None) == 401:
+            return True
+        if type(error).__name__ == "APIServerError":
+            fields = (getattr(error, "code", None), getattr(error, "error", None))
+            text = " ".join(str(f) for f in fields if f is not None).lower()
+            if "401" in text or any(m in text for m in AUTH_ERROR_MARKERS):
+                return True
+    return False
+
+
+class ServerHealth:
+    """
+    Circuit breaker for one server.
+
+    After ``failure_threshold`` consecutive unreachable errors the circuit
+    opens and calls fail fast with ServerUnavailable. Once the backoff has
+    passed, a single caller probes the server with ``auth_info``; success
+    closes the circuit, failure reopens it with a doubled backoff (capped at
+    ``max_backoff``).
+    """
+
+    def __init__(
+        self,
+        key,
+        failure_threshold: int = FAILURE_THRESHOLD,
+        backoff: float = BACKOFF_SECONDS,
+        max_backoff: float = MAX_BACKOFF_SECONDS,
+    ):
+        self.key = key
+        self.failure_threshold = failure_threshold
+        self.base_backoff = backoff
+        self.max_backoff = max_backoff
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.backoff = backoff
+        self.retry_at = None
+        self.last_error = None
+        self._lock = threading.Lock()
+
+    def seconds_until_retry(self) -> float:
+        if self.state != OPEN or self.retry_at is None:
+            return 0.0
+        return max(0.0, self.retry_at - time.monotonic())
+
+    def describe(self) -> str:
+        if self.state == CLOSED:
+            return "Reachable"
+        if self.state == HALF_OPEN:
+            return "Checking connection…"
+        return f"Unreachable, retrying in {self.seconds_until_retry():.0f}s"
+
+    def _set_state(self, state) -> bool:
+        changed = state != self.state
+        self.state = state
+        return changed
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.consecutive_failures = 0
+            self.backoff = self.base_backoff
+            self.retry_at = None
+            self.last_error = None
+            changed = self._set_state(CLOSED)
+        if changed:
+            _notify(self)
+
+    def record_failure(self, exc: BaseException) -> None:
+        with self._lock:
+            self.last_error = exc
+            self.consecutive_failures += 1
+            if self.state == HALF_OPEN:
+                self.backoff = min(self.backoff * 2, self.max_backoff)
+            elif self.consecutive_failures < self.failure_threshold:
+                return
+            self.retry_at = time.monotonic() + self.backoff
+            changed = self._set_state(OPEN)
+        if changed:
+            _notify(self)
+
+    def _claim_probe(self) -> bool:
+        """Move an expired open circuit to half-open; only one caller wins."""
+        with self._lock:
+            if self.state != OPEN or time.monotonic() < self.retry_at:
+                return False
+            self._set_state(HALF_OPEN)
+        _notify(self)
+        return True
+
+    def call(self, server, fn, *args, **kwargs):
+        """Run fn(*args, **kwargs) through the breaker."""
+        if self.state == HALF_OPEN:
+            # Another caller is probing; do not pile onto a dead server.
+            raise ServerUnavailable(self.describe())
+        if self.state == OPEN:
+            if not self._claim_probe():
+                raise ServerUnavailable(self.describe())
+            try:
+                server.auth_info()
+            except Exception as exc:
+                if is_unreachable_error(exc):
+                    self.record_failure(exc)
+                    raise ServerUnavailable(self.describe()) from exc
+            self.record_success()
+
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as exc:
+            if is_unreachable_error(exc):
+                self.record_failure(exc)
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+
+_health: dict = {}
+_health_lock = threading.Lock()
+_listeners: list = []
+
+
+def health_for(server) -> ServerHealth:
+    """Health tracker for a TabsdataServer, keyed by its API URL."""
+    key = getattr(getattr(server, "connection", None), "url", None) or id(server)
+    with _health_lock:
+        health = _health.get(key)
+        if health is None:
+            health = _health[key] = ServerHealth(key)
+        return health
+
+
+def add_listener(callback) -> None:
+    """Call ``callback(health)`` whenever a tracker changes state."""
+    _listeners.append(callback)
+
+
+def remove_listener(callback) -> None:
+    if callback in _listeners:
+        _listeners.remove(callback)
+
+
+def _notify(health: ServerHealth) -> None:
+    for callback in list(_listeners):
+        try:
+            callback(health)
+        except Exception:
+            pass
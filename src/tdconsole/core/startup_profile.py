@@ -0,0 +1,131 @@
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+DEFAULT_PROFILE_PATH = "tdconsole-startup-profile.json"
+
+
+class ImportTimer:
+    """
+    sys.meta_path hook recording how long each module takes to import.
+
+    It finds specs through the finders behind it and wraps the loader's
+    exec_module, so the timings match what ``python -X importtime`` reports:
+    cumulative time includes nested imports, self time does not.
+    """
+
+    def __init__(self):
+        self.records: list[dict] = []
+        self._local = threading.local()
+
+    def install(self) -> None:
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self) -> None:
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path=None, target=None):
+        if getattr(self._local, "finding", False):
+            return None
+        self._local.finding = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(fullname, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._local.finding = False
+
+        loader = spec.loader
+        # Builtin and frozen importers are shared classes; leave them alone.
+        if loader is None or isinstance(loader, type):
+            return spec
+        exec_module = getattr(loader, "exec_module", None)
+        if exec_module is None:
+            return spec
+        try:
+            loader.exec_module = self._timed(fullname, exec_module)
+        except AttributeError:
+            pass
+        return spec
+
+    def _timed(self, fullname, exec_module):
+        def timed_exec_module(module):
+            stack = self._local.__dict__.setdefault("stack", [])
+            record = {"module": fullname, "depth": len(stack), "children_s": 0.0}
+            stack.append(record)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                elapsed = time.perf_counter() - start
+                stack.pop()
+                if stack:
+                    stack[-1]["children_s"] += elapsed
+                record["cumulative_ms"] = round(elapsed * 1000, 3)
+                record["self_ms"] = round(
+                    (elapsed - record.pop("children_s")) * 1000, 3
+                )
+                self.records.append(record)
+
+        return timed_exec_module
+
+
+class StartupProfile:
+    """Collects import timings and time-to-first-frame for one app start."""
+
+    def __init__(self, path: str | Path = DEFAULT_PROFILE_PATH):
+        self.path = Path(path)
+        self.started = time.perf_counter()
+        self.timer = ImportTimer()
+        self.first_frame_ms = None
+        # Set when the report could not be written; run_app prints it once
+        # the app has given the terminal back.
+        self.write_error = None
+
+    def start(self) -> None:
+        self.timer.install()
+
+    def first_frame(self) -> None:
+        """Record time-to-first-frame, stop timing imports and write the report."""
+        if self.first_frame_ms is not None:
+            return
+        self.first_frame_ms = round((time.perf_counter() - self.started) * 1000, 3)
+        self.timer.uninstall()
+        self.write()
+
+    def report(self) -> dict:
+        records = self.timer.records
+        top_level = [r for r in records if r["depth"] == 0]
+        return {
+            "python": sys.version.split()[0],
+            "tdconsole_version": _distribution_version("tdconsole"),
+            "tabsdata_version": _distribution_version("tabsdata"),
+            "time_to_first_frame_ms": self.first_frame_ms,
+            "import_total_ms": round(sum(r["cumulative_ms"] for r in top_level), 3),
+            "module_count": len(records),
+            "modules": sorted(records, key=lambda r: r["cumulative_ms"], reverse=True),
+        }
+
+    def write(self) -> None:
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self.path.write_text(json.dumps(self.report(), indent=2))
+        except OSError as exc:
+            self.write_error = f"Could not write startup profile to {self.path}: {exc}"
+
+
+def _distribution_version(name: str):
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
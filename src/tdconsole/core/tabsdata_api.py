@@ -1,10 +1,154 @@
-from contextlib import nullcontext
+from __future__ import annotations
 
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TYPE_CHECKING, Iterator
+
+from sqlalchemy import delete, insert, select, tuple_
 from sqlalchemy.orm import Session
-from tabsdata.api.tabsdata_server import TabsdataServer
 
-from tdconsole.core.models import Collection, Function, Instance, Table
-from tdconsole.core.subprocess_runner import run_bash
+from tdconsole.core.models import Collection, Function, Table
+from tdconsole.core.server_health import health_for, is_authentication_error
+
+if TYPE_CHECKING:
+    from tabsdata.api.tabsdata_server import TabsdataServer
+
+
+DEFAULT_USERNAME = "admin"
+DEFAULT_PASSWORD = "tabsdata"
+DEFAULT_ROLE = "sys_admin"
+
+# Refresh tokens this many seconds before they expire.
+TOKEN_REFRESH_MARGIN = 60.0
+
+# Authenticated clients keyed by (socket, user, role), so switching back to
+# an instance reuses its client instead of logging in again.
+_clients: dict[tuple[str, str, str], TabsdataServer] = {}
+_client_locks: dict[tuple[str, str, str], threading.Lock] = {}
+_client_passwords: dict[tuple[str, str, str], str] = {}
+_clients_lock = threading.Lock()
+
+
+def _ensure_fresh_credentials(server: TabsdataServer, username, password, role):
+    connection = server.connection
+    expiration_time = connection.expiration_time
+    if expiration_time is None or time.time() < expiration_time - TOKEN_REFRESH_MARGIN:
+        return
+    try:
+        connection.authentication_refresh()
+    except Exception:
+        connection.authentication_login(username, password, role=role)
+
+
+def get_tabsdata_server(
+    socket: str,
+    username: str = DEFAULT_USERNAME,
+    password: str = DEFAULT_PASSWORD,
+    role: str = DEFAULT_ROLE,
+) -> TabsdataServer:
+    """
+    Return an authenticated TabsdataServer for (socket, username, role).
+
+    Clients are created once and kept; later calls only refresh the token
+    when it is about to expire, falling back to a fresh login if the
+    refresh is rejected. A client that cannot be re-authenticated is
+    dropped and the error propagates.
+    """
+    key = (socket, username, role)
+    with _clients_lock:
+        lock = _client_locks.setdefault(key, threading.Lock())
+
+    with lock:
+        server = _clients.get(key)
+        if server is None:
+            from tabsdata.api.tabsdata_server import TabsdataServer
+
+            server = TabsdataServer(socket, username, password, role)
+            _clients[key] = server
+            _client_passwords[key] = password
+            return server
+        try:
+            _ensure_fresh_credentials(server, username, password, role)
+        except Exception:
+            _forget_key(key)
+            raise
+        return server
+
+
+def forget_tabsdata_server(socket: str, username=DEFAULT_USERNAME, role=DEFAULT_ROLE):
+    """Drop a cached client, e.g. after its instance was stopped or rebound."""
+    _forget_key((socket, username, role))
+
+
+def _forget_key(key) -> None:
+    with _clients_lock:
+        _clients.pop(key, None)
+        _client_locks.pop(key, None)
+        _client_passwords.pop(key, None)
+
+
+def _client_key(server: TabsdataServer):
+    with _clients_lock:
+        for key, client in _clients.items():
+            if client is server:
+                return key
+    return None
+
+
+def _login_again(server: TabsdataServer, rejected_token) -> bool:
+    """
+    Log a cached client in again after the server rejected its token.
+
+    Concurrent callers that saw the same token rejected share one login.
+    Returns False, having dropped the client, when it is not cached or the
+    login fails.
+    """
+    key = _client_key(server)
+    if key is None:
+        return False
+    with _clients_lock:
+        lock = _client_locks.get(key)
+        password = _client_passwords.get(key)
+    if lock is None or password is None:
+        return False
+
+    _, username, role = key
+    with lock:
+        connection = server.connection
+        if connection.bearer_token != rejected_token:
+            return True
+        try:
+            connection.authentication_login(username, password, role=role)
+        except Exception:
+            _forget_key(key)
+            return False
+    return True
+
+
+# Where the td CLI keeps its login (see tabsdata._cli.cli_utils).
+CLI_CREDENTIALS_FILE = os.path.expanduser("~/.tabsdata/connection.json")
+
+
+def store_cli_credentials(socket: str, username: str, password: str, role: str):
+    """
+    Make (socket, username, role) the td CLI's current login in-process.
+
+    This is what ``td login`` does: log in with a connection whose
+    credentials_file is the CLI's connection.json, which the public
+    APIServer login writes. The td CLI refreshes those tokens itself.
+    """
+    from tabsdata.api.apiserver import obtain_connection
+
+    os.makedirs(os.path.dirname(CLI_CREDENTIALS_FILE), exist_ok=True)
+    obtain_connection(
+        socket,
+        username,
+        password,
+        role=role,
+        credentials_file=CLI_CREDENTIALS_FILE,
+    )
 
 
 def initialize_tabsdata_server_connection(app):
@@ -12,10 +156,10 @@ def initialize_tabsdata_server_connection(app):
     try:
         if instance is not None:
             socket = instance.ext_socket
-            username = "admin"
-            password = "tabsdata"
-            role = "sys_admin"
-            server = TabsdataServer(socket, username, password, role)
+            username = DEFAULT_USERNAME
+            password = DEFAULT_PASSWORD
+            role = DEFAULT_ROLE
+            server = get_tabsdata_server(socket, username, password, role)
         else:
             server = None
     except:
@@ -23,97 +167,297 @@ def initialize_tabsdata_server_connection(app):
 
     if server:
         try:
-            run_bash(
-                f"td login --server {socket} --user {username} --role {role} --password {password}"
-            )
+            store_cli_credentials(socket, username, password, role)
             app.notify("Login Successful")
         except:
             app.notify("Login Failed")
     return server
 
 
-def pull_all_collections(app):
-    try:
-        server = app.tabsdata_server
-        server: TabsdataServer
-        collections = server.list_collections()
-        return collections
-    except:
-        return []
+# Read-only calls that are coalesced and briefly cached by call_server.
+SINGLE_FLIGHT_METHODS = frozenset(
+    {"auth_info", "list_collections", "list_functions", "list_tables"}
+)
+MICRO_CACHE_TTL = 2.0
+
+_inflight: dict[tuple, Future] = {}
+_recent: dict[tuple, tuple[float, object]] = {}
+# Bumped by invalidate_server_cache; results of flights that started before
+# an invalidation are not cached. _all_generation covers "every server".
+_generations: dict = {}
+_all_generation = 0
+_flight_lock = threading.Lock()
+
 
+def _server_key(server: TabsdataServer):
+    return getattr(getattr(server, "connection", None), "url", None) or id(server)
+
+
+def _generation(server_key) -> tuple[int, int]:
+    return _all_generation, _generations.get(server_key, 0)
+
+
+def _copy_result(result):
+    # Callers append placeholder items to the lists they get back.
+    return list(result) if isinstance(result, list) else result
+
+
+def _single_flight(key: tuple, fn):
+    """
+    Run fn() once for all concurrent callers with the same key and serve
+    its result to repeat callers for MICRO_CACHE_TTL seconds. Errors are
+    shared with the callers waiting on that flight but never cached.
+
+    key[0] is the server key. Flights are tied to the server's cache
+    generation: a caller arriving after invalidate_server_cache starts a
+    new flight, and a flight that was overtaken by one is not cached.
+    """
+    with _flight_lock:
+        now = time.monotonic()
+        cached = _recent.get(key)
+        if cached is not None and now - cached[0] < MICRO_CACHE_TTL:
+            return _copy_result(cached[1])
+        generation = _generation(key[0])
+        flight = (key, generation)
+        future = _inflight.get(flight)
+        leader = future is None
+        if leader:
+            future = _inflight[flight] = Future()
+
+    if not leader:
+        return _copy_result(future.result())
 
-def pull_functions_from_collection(app, collection):
     try:
-        server = app.tabsdata_server
-        server: TabsdataServer
-        functions = server.list_functions(collection)
-        return functions
-    except:
-        return []
+        result = fn()
+    except BaseException as exc:
+        with _flight_lock:
+            _inflight.pop(flight, None)
+        future.set_exception(exc)
+        raise
+    with _flight_lock:
+        _inflight.pop(flight, None)
+        now = time.monotonic()
+        for stale in [k for k, (t, _) in _recent.items() if now - t >= MICRO_CACHE_TTL]:
+            del _recent[stale]
+        if _generation(key[0]) == generation:
+            _recent[key] = (now, result)
+    future.set_result(result)
+    return _copy_result(result)
+
 
+def invalidate_server_cache(server: TabsdataServer | None = None) -> None:
+    """
+    Forget micro-cached results, for one server or all of them, and keep
+    calls already in flight from caching what they read before the change.
+    """
+    global _all_generation
+    with _flight_lock:
+        if server is None:
+            _all_generation += 1
+            _recent.clear()
+            return
+        server_key = _server_key(server)
+        _generations[server_key] = _generations.get(server_key, 0) + 1
+        for key in [k for k in _recent if k[0] == server_key]:
+            del _recent[key]
 
-def pull_tables_from_collection(app, collection):
+
+def call_server(server: TabsdataServer, method: str, *args, **kwargs):
+    """
+    Call ``server.<method>(*args, **kwargs)`` through the server's health
+    tracker, raising ServerUnavailable straight away while it is down.
+    Read calls in SINGLE_FLIGHT_METHODS are coalesced with identical
+    in-flight calls and served from a short-lived cache.
+    A call rejected for its credentials is retried once after logging in
+    again; a client that cannot log in is dropped from the cache.
+    """
+
+    def call():
+        health = health_for(server)
+        token = getattr(getattr(server, "connection", None), "bearer_token", None)
+        try:
+            return health.call(server, getattr(server, method), *args, **kwargs)
+        except Exception as exc:
+            if not is_authentication_error(exc) or not _login_again(server, token):
+                raise
+        return health.call(server, getattr(server, method), *args, **kwargs)
+
+    if method not in SINGLE_FLIGHT_METHODS:
+        return call()
+    key = (_server_key(server), method, args, tuple(sorted(kwargs.items())))
+    return _single_flight(key, call)
+
+
+def pull_collections_from_server(server: TabsdataServer):
+    """list_collections, or None when the call failed (unlike an empty catalog)."""
     try:
-        server = app.tabsdata_server
-        server: TabsdataServer
-        tables = server.list_tables(collection)
-        return tables
-    except:
-        return []
+        return call_server(server, "list_collections")
+    except Exception:
+        return None
 
 
-def check_server_status(app, server: TabsdataServer = None):
-    if not server:
-        server = app.tabsdata_server
+CATALOG_FETCH_WORKERS = 8
+CATALOG_CALL_TIMEOUT = 15.0
+CATALOG_KINDS = ("tables", "functions")
 
-    if not server:
-        return False
 
+def fetch_catalog(
+    server: TabsdataServer,
+    collection_names,
+    kinds=CATALOG_KINDS,
+    max_workers: int = CATALOG_FETCH_WORKERS,
+    timeout: float | None = CATALOG_CALL_TIMEOUT,
+) -> Iterator[tuple[str, str, list | None]]:
+    """
+    Run list_tables/list_functions for every collection concurrently on a
+    bounded thread pool and yield (collection, kind, items) as each call
+    completes. items is None when the call failed or ran longer than
+    ``timeout`` seconds; a timed-out call is abandoned, not interrupted.
+    """
+    calls = {"tables": "list_tables", "functions": "list_functions"}
+    started: dict = {}
+
+    def run(future_key, method, collection):
+        started[future_key] = time.monotonic()
+        return call_server(server, method, collection)
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers, thread_name_prefix="tdconsole-catalog"
+    )
     try:
-        auth_status = server.auth_info()
-        return True
-    except:
-        return False
+        pending = {}
+        for collection in collection_names:
+            for kind in kinds:
+                key = (collection, kind)
+                pending[executor.submit(run, key, calls[kind], collection)] = key
 
+        while pending:
+            done, _ = wait(
+                pending,
+                timeout=None if timeout is None else min(timeout, 0.25),
+                return_when=FIRST_COMPLETED,
+            )
+            for future in done:
+                collection, kind = pending.pop(future)
+                try:
+                    items = future.result()
+                except Exception:
+                    items = None
+                yield collection, kind, items
 
-def sync_instance_to_db(app):
-    session = app.session
-    session: Session
-    server = app.tabsdata_server
-    instance = app.working_instance
-    server: TabsdataServer
-    server_status = check_server_status(app, server)
+            if timeout is None:
+                continue
+            now = time.monotonic()
+            for future, key in list(pending.items()):
+                if key in started and now - started[key] > timeout:
+                    del pending[future]
+                    health_for(server).record_failure(TimeoutError(key))
+                    yield key[0], key[1], None
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
 
-    if not server_status:
-        return None
 
-    collections = pull_all_collections(app)
+def _stored_catalog(session: Session, instance_name: str):
+    collections = set(
+        session.execute(
+            select(Collection.name).where(Collection.instance_name == instance_name)
+        ).scalars()
+    )
+    tables = set(
+        session.execute(
+            select(Table.collection_name, Table.name).where(
+                Table.instance_name == instance_name
+            )
+        ).tuples()
+    )
+    functions = set(
+        session.execute(
+            select(Function.collection_name, Function.name).where(
+                Function.instance_name == instance_name
+            )
+        ).tuples()
+    )
+    return collections, tables, functions
 
-    if len(collections) == 0:
-        return None
 
-    data = {
-        i.name: {
-            "tables": pull_tables_from_collection(app, i.name),
-            "functions": pull_functions_from_collection(app, i.name),
-        }
-        for i in collections
-    }
-
-    instance = session.query(Instance).filter_by(name=instance.name).one()
-    tx = nullcontext()
-    if not session.in_transaction():
-        tx = session.begin()
-    with tx:
-        instance.collections.clear()
+def _delete_keys(session: Session, model, instance_name: str, keys) -> None:
+    if not keys:
+        return
+    session.execute(
+        delete(model).where(
+            model.instance_name == instance_name,
+            tuple_(model.collection_name, model.name).in_(sorted(keys)),
+        )
+    )
+
+
+def _insert_keys(session: Session, model, instance_name: str, keys) -> None:
+    if not keys:
+        return
+    session.execute(
+        insert(model),
+        [
+            {"instance_name": instance_name, "collection_name": c, "name": n}
+            for c, n in sorted(keys)
+        ],
+    )
+
+
+def apply_catalog_diff(session: Session, instance_name: str, data: dict) -> bool:
+    """
+    Bring the stored catalog of an instance in line with ``data``
+    ({collection: {"tables": [...], "functions": [...]}}) by inserting and
+    deleting only the rows that differ. A kind that is None or missing (its
+    call failed) keeps the stored rows for that collection. All statements
+    run in one transaction; when nothing differs nothing is written.
+    Returns True if any row changed.
+    """
+    stored_collections, stored_tables, stored_functions = _stored_catalog(
+        session, instance_name
+    )
+
+    def wanted(kind, stored):
+        keys = set()
         for name, v in data.items():
-            c = Collection(name=name, instance=instance)
-            c.tables = [
-                Table(name=getattr(t, "name"), instance_name=instance.name)
-                for t in v["tables"]
-            ]
-            c.functions = [
-                Function(name=getattr(f, "name"), instance_name=instance.name)
-                for f in v["functions"]
-            ]
-            session.add(c)
+            items = v.get(kind)
+            if items is None:
+                keys.update(key for key in stored if key[0] == name)
+            else:
+                keys.update((name, getattr(item, "name")) for item in items)
+        return keys
+
+    collections = set(data)
+    tables = wanted("tables", stored_tables)
+    functions = wanted("functions", stored_functions)
+    if (
+        collections == stored_collections
+        and tables == stored_tables
+        and functions == stored_functions
+    ):
+        return False
+
+    try:
+        # Children first on delete, parents first on insert.
+        _delete_keys(session, Function, instance_name, stored_functions - functions)
+        _delete_keys(session, Table, instance_name, stored_tables - tables)
+        removed = stored_collections - collections
+        if removed:
+            session.execute(
+                delete(Collection).where(
+                    Collection.instance_name == instance_name,
+                    Collection.name.in_(sorted(removed)),
+                )
+            )
+        added = collections - stored_collections
+        if added:
+            session.execute(
+                insert(Collection),
+                [{"instance_name": instance_name, "name": n} for n in sorted(added)],
+            )
+        _insert_keys(session, Table, instance_name, tables - stored_tables)
+        _insert_keys(session, Function, instance_name, functions - stored_functions)
+        session.commit()
+    except Exception:
+        session.rollback()
+        raise
+    return True
@@ -1,27 +1,161 @@
 #!/home/tabsdata/tabsdata-env/bin/python
-import yaml, os, argparse, sys
+import yaml, os, argparse, json, sys, tempfile, threading
+from contextlib import contextmanager
 
+# libyaml's loader is several times faster; fall back to the pure Python one.
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+SafeDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
 
-def get_yaml_value(path, key):
+# path -> ((mtime_ns, size), parsed document)
+_document_cache = {}
+_document_cache_lock = threading.Lock()
+
+
+def load_yaml_document(path):
+    """
+    Parse a YAML file, reusing the previous parse while the file's mtime and
+    size are unchanged. The returned document is shared: do not mutate it.
+    """
+    path = os.fspath(path)
+    stat = os.stat(path)
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    with _document_cache_lock:
+        cached = _document_cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with open(path) as f:
+        data = yaml.load(f, Loader=SafeLoader) or {}
+    with _document_cache_lock:
+        _document_cache[path] = (stamp, data)
+    return data
+
+
+def clear_yaml_cache(path=None):
+    with _document_cache_lock:
+        if path is None:
+            _document_cache.clear()
+        else:
+            _document_cache.pop(os.fspath(path), None)
+
+
+def _first_value(result):
+    return result if type(result) == str else result[0]
+
+
+def get_yaml_values(path, keys):
+    """Return {key: value} for several keys from a single parse of path."""
     try:
-        with open(path) as f:
-            data = yaml.safe_load(f) or {}
-        result = data.get(key)
-        return result if type(result) == str else result[0]
+        data = load_yaml_document(path)
     except:
+        return {key: None for key in keys}
+
+    values = {}
+    for key in keys:
+        try:
+            values[key] = _first_value(data.get(key))
+        except:
+            values[key] = None
+    return values
+
+
+def get_yaml_value(path, key):
+    return get_yaml_values(path, [key])[key]
+
+
+class AbortEdit(Exception):
+    """Raise inside yaml_edit() to leave the file untouched."""
+
+
+def _write_atomic(path, data):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "w") as f:
+            yaml.dump(data, f, Dumper=SafeDumper, sort_keys=False)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            os.chmod(tmp_path, os.stat(path).st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+    # Persist the rename itself.
+    try:
+        dir_fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(dir_fd)
+    except OSError:
+        pass
+    finally:
+        os.close(dir_fd)
+
+
+@contextmanager
+def yaml_edit(path):
+    """
+    Edit a YAML file as one transaction:
+
+        with yaml_edit(path) as doc:
+            doc["addresses"] = ["127.0.0.1:2457"]
+            doc["internal_addresses"] = ["127.0.0.1:2458"]
+
+    The file is parsed once and, if the block exits cleanly, written once to
+    a temporary file that is fsynced and renamed over the original. An
+    exception leaves the file as it was; AbortEdit does so silently.
+    """
+    path = os.fspath(path)
+    with open(path) as f:
+        data = yaml.load(f, Loader=SafeLoader) or {}
+    try:
+        yield data
+    except AbortEdit:
+        return
+    _write_atomic(path, data)
+    clear_yaml_cache(path)
+
+
+def set_in_document(data, key, value, value_type):
+    if value_type == "str":
+        data[key] = value
+    elif value_type == "list":
+        data[key] = [value]
+
+
+def append_in_document(data, key, value):
+    """Append value to the list at key; return the list, or None if key is not a list."""
+    current = data.get(key)
+
+    if current is None:
+        data[key] = [value]
+
+    elif isinstance(current, list):
+        if value not in current:
+            current.append(value)
+        data[key] = current
+
+    else:
         return None
 
+    return data[key]
+
 
 def set_yaml_value(path, key, value, value_type):
     try:
-        with open(path) as f:
-            data = yaml.safe_load(f) or {}
-        if value_type == "str":
-            data[key] = value
-        elif value_type == "list":
-            data[key] = [value]
-        with open(path, "w") as f:
-            yaml.safe_dump(data, f, sort_keys=False)
+        with yaml_edit(path) as data:
+            set_in_document(data, key, value, value_type)
         return f"Successfully set {value} on {key}"
     except:
         return f"Failed to set {value} on {key}"
@@ -40,32 +174,104 @@ def get_process_arg(process, key):
 
 def append_yaml_value(path, key, value):
     try:
-        with open(path) as f:
-            data = yaml.safe_load(f) or {}
+        with yaml_edit(path) as data:
+            result = append_in_document(data, key, value)
+            if result is None:
+                raise AbortEdit
+        return result if result is not None else "None"
+
+    except Exception:
+        return "None"
 
-        current = data.get(key)
 
-        if current is None:
-            data[key] = [value]
+BATCH_OPS = {"get", "set", "append", "get_arg"}
+BATCH_WRITE_OPS = {"set", "append"}
 
-        elif isinstance(current, str):
-            return "None"
 
-        elif isinstance(current, list):
-            if value not in current:
-                current.append(value)
-            data[key] = current
+def _apply_batch_op(data, op):
+    """Apply one get/set/append to a loaded document and return (ok, value)."""
+    key = op["key"]
+    if op["op"] == "get":
+        try:
+            value = _first_value(data.get(key))
+        except:
+            value = None
+        return value is not None, value
+    if op["op"] == "set":
+        value = os.path.expandvars(str(op["value"]))
+        set_in_document(data, key, value, op.get("type", "str"))
+        return True, value
+    result = append_in_document(data, key, op["value"])
+    return result is not None, result
 
-        else:
-            return "None"
 
-        with open(path, "w") as f:
-            yaml.safe_dump(data, f, sort_keys=False)
+def run_batch(operations):
+    """
+    Run many yamlz operations with one parse and at most one write per file.
 
-        return data[key]
+    Operations are dicts with "op" (get, set, append or get_arg), "path",
+    "key" and, for writes, "value" (and "type" for set). They are grouped by
+    path and applied in their original order within each file, so a get after
+    a set on the same file sees the new value. Results come back in input
+    order as dicts with "index", "ok" and either "value" or "error".
+    """
+    results = [None] * len(operations)
+    by_path = {}
+
+    for index, op in enumerate(operations):
+        if not isinstance(op, dict) or op.get("op") not in BATCH_OPS:
+            results[index] = {"index": index, "ok": False, "error": "unknown op"}
+            continue
+        missing = [f for f in ("path", "key") if op.get(f) is None]
+        if op["op"] in BATCH_WRITE_OPS and op.get("value") is None:
+            missing.append("value")
+        if missing:
+            results[index] = {
+                "index": index,
+                "ok": False,
+                "error": f"missing {', '.join(missing)}",
+            }
+            continue
+        if op["op"] == "get_arg":
+            value = get_process_arg(op["path"], op["key"])
+            results[index] = {"index": index, "ok": value != "None", "value": value}
+            continue
+        by_path.setdefault(os.fspath(op["path"]), []).append((index, op))
+
+    for path, ops in by_path.items():
+        try:
+            if any(op["op"] in BATCH_WRITE_OPS for _, op in ops):
+                with yaml_edit(path) as data:
+                    changed = False
+                    for index, op in ops:
+                        ok, value = _apply_batch_op(data, op)
+                        changed |= ok and op["op"] in BATCH_WRITE_OPS
+                        results[index] = {"index": index, "ok": ok, "value": value}
+                    if not changed:
+                        raise AbortEdit
+            else:
+                data = load_yaml_document(path)
+                for index, op in ops:
+                    ok, value = _apply_batch_op(data, op)
+                    results[index] = {"index": index, "ok": ok, "value": value}
+        except Exception as exc:
+            for index, _ in ops:
+                results[index] = {"index": index, "ok": False, "error": repr(exc)}
+
+    return results
 
-    except Exception:
-        return "None"
+
+def _read_batch_operations(source):
+    operations = []
+    for line in source:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            operations.append(json.loads(line))
+        except ValueError:
+            operations.append(None)
+    return operations
 
 
 def main():
@@ -95,6 +301,14 @@ def main():
     ap.add_argument("--key", required=True)
     ap.add_argument("--value", required=True)
 
+    bp = subparsers.add_parser(
+        "batch",
+        help="Run many get/set/append/get_arg operations given as JSON lines",
+    )
+    bp.add_argument(
+        "--file", default="-", help="JSON lines file of operations ('-' for stdin)"
+    )
+
     args = parser.parse_args()
 
     if args.command == "get":
@@ -113,6 +327,17 @@ def main():
     elif args.command == "append":
         result = append_yaml_value(args.path, args.key, args.value)
         print(result)
+    elif args.command == "batch":
+        if args.file == "-":
+            operations = _read_batch_operations(sys.stdin)
+        else:
+            with open(args.file) as f:
+                operations = _read_batch_operations(f)
+        results = run_batch(operations)
+        for result in results:
+            print(json.dumps(result, default=str))
+        if not all(result["ok"] for result in results):
+            sys.exit(1)
 
 
 if __name__ == "__main__":
@@ -10,7 +10,8 @@ from textual import on
 from textual.reactive import reactive
 from textual.widgets import Label, ListItem, ListView, Static
 
-from tdconsole.core.find_instances import instance_name_to_instance, sync_filesystem_instances_to_db
+from tdconsole.core.find_instances import instance_name_to_instance
+from tdconsole.core.server_health import CLOSED, health_for
 
 
 class BSOD(Static):
@@ -20,10 +21,10 @@ class BSOD(Static):
 class InstanceWidget(Static):
     """Rich panel showing the current working instance."""
 
-    def __init__(self, inst: Optional[str] = None, **kwargs):
+    def __init__(self, inst: Optional[str] = None, processes=None, **kwargs):
         super().__init__(**kwargs)
         if isinstance(inst, str):
-            inst = instance_name_to_instance(inst)
+            inst = instance_name_to_instance(inst, processes=processes)
         if isinstance(inst, list):
             inst = inst[0] if inst else None
         self.inst = inst
@@ -74,19 +75,30 @@ class CurrentInstanceWidget(InstanceWidget):
 
     def render(self) -> RenderableType:
         instance_panel = self._make_instance_panel()
-        header = Align.center(Text("Current Working Instance:", style="bold #22c55e"))
-        inner = Group(header, Align.center(instance_panel))
+        header = Text("Current Working Instance:", style="bold #22c55e")
+        if getattr(self.app, "instances_stale", False):
+            header.append("  (last known, refreshing…)", style="dim")
+        header = Align.center(header)
+        parts = [header, Align.center(instance_panel)]
+        server = getattr(self.app, "tabsdata_server", None)
+        if server is not None:
+            health = health_for(server)
+            if health.state != CLOSED:
+                parts.append(
+                    Align.center(Text(f"Server: {health.describe()}", style="#ef4444"))
+                )
+        inner = Group(*parts)
         outer = Panel(inner, border_style="#0f766e", expand=False)
         return Align.center(outer)
 
     def resolve_working_instance(self, instance=None):
+        # The instance watcher keeps app.working_instance current; reading it
+        # here keeps filesystem syncs off the event loop.
         if isinstance(instance, str):
-            instance = instance_name_to_instance(instance)
+            instance = self.app.app_query_session("instances", limit=1, name=instance)
         if isinstance(instance, list):
             instance = instance[0] if instance else None
-        sync_filesystem_instances_to_db(app=self.app)
-        working_instance = self.app.app_query_one("instances", working=True)
-        self.inst = working_instance or instance
+        self.inst = self.app.working_instance or instance
 
 
 class LabelItem(ListItem):
@@ -2,9 +2,10 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Optional
 
-from tdconsole.core.find_instances import (
-    sync_filesystem_instances_to_db as sync_filesystem_instances_to_db,
-)
+from sqlalchemy import or_
+
+from tdconsole.core.find_instances import list_instances, watcher_active
+from tdconsole.core.models import Instance
 
 
 def validate_port(port_str: str) -> bool:
@@ -23,7 +24,7 @@ def get_running_ports(app) -> List[Dict[str, Any]]:
     Returns a list of dicts for running instances, each with:
       name, status, external_port, internal_port
     """
-    instances = sync_filesystem_instances_to_db(app=app)
+    instances = list_instances(app=app)
     running = []
 
     for inst in instances:
@@ -32,12 +33,8 @@ def get_running_ports(app) -> List[Dict[str, Any]]:
             continue
 
         name = inst.name
-        arg_ext = inst.arg_ext or ""
-        arg_int = inst.arg_int or ""
-
-        # Only keep if they look like valid ports; otherwise ignore
-        ext_port = int(arg_ext) if arg_ext.isdigit() else None
-        int_port = int(arg_int) if arg_int.isdigit() else None
+        ext_port = inst.arg_ext
+        int_port = inst.arg_int
 
         running.append(
             {
@@ -57,25 +54,23 @@ def port_in_use(
     """
     Return the instance name using this port, or None if free.
     """
-    for inst in get_running_ports(app):
-        name = inst.get("name")
-        if current_instance_name and name == current_instance_name:
-            continue
-
-        ext_port = inst.get("external_port")
-        int_port = inst.get("internal_port")
-
-        if ext_port == port or int_port == port:
-            return name
-
-    return None
+    if not watcher_active(app):
+        # Refreshes the rows in the background; check what we have now.
+        list_instances(app=app)
+    query = app.session.query(Instance.name).filter(
+        Instance.status == "Running",
+        or_(Instance.arg_ext == port, Instance.arg_int == port),
+    )
+    if current_instance_name:
+        query = query.filter(Instance.name != current_instance_name)
+    return query.limit(1).scalar()
 
 
 def name_in_use(app, selected_name: str) -> bool:
     """
     Return True if an instance already uses this name.
     """
-    for inst in sync_filesystem_instances_to_db(app):
+    for inst in list_instances(app=app):
         name = inst.name
         if selected_name == name:
             return True
@@ -16,13 +16,12 @@ import time
 from dataclasses import dataclass
 from functools import partial
 from pathlib import Path
-from typing import Awaitable, Callable, Iterable, List, Optional
+from typing import TYPE_CHECKING, Awaitable, Callable, Iterable, List, Optional
 
 from rich.console import Group, RenderableType
 from rich.panel import Panel
 from rich.text import Text
 from sqlalchemy.orm import Session
-from tabsdata.api.tabsdata_server import Collection, Function, TabsdataServer
 from textual import events, on, work
 from textual.app import ComposeResult
 from textual.containers import (
@@ -56,14 +55,32 @@ from textual.widgets._tree import TreeNode
 from textual_autocomplete._autocomplete import DropdownItem, TargetState
 
 from tdconsole.core import input_validators, instance_tasks, tabsdata_api
+from tdconsole.core.background import BlockingCallDone, run_blocking
+from tdconsole.core.catalog_store import (
+    CachedCollection,
+    CachedFunction,
+    CatalogChanged,
+    LIVE,
+)
+from tdconsole.core.cli_parse import CommandLine, CommandLineParser
+from tdconsole.core.cli_tree import load_td_cli_tree
 from tdconsole.core.construct_command_trie import CliAutoComplete, Node
 from tdconsole.core.find_instances import (
     instance_name_to_instance,
-    sync_filesystem_instances_to_db,
+    list_instances,
+    scan_apiserver_processes,
 )
 from tdconsole.core.models import Instance
 from tdconsole.textual_assets.spinners import SpinnerWidget
 
+if TYPE_CHECKING:
+    from tabsdata.api.tabsdata_server import TabsdataServer
+
+# Seconds typing must pause before CLI completion fetches values it lacks,
+# and how long before the same missing values are fetched again.
+CANDIDATE_FETCH_DEBOUNCE = 0.3
+CANDIDATE_REFETCH_INTERVAL = 10.0
+
 
 class ExitBar(Container):
     DEFAULT_CSS = """
@@ -146,8 +163,9 @@ class RefreshBar(Container):
 
     @on(Button.Pressed, "#refresh-btn")
     def on_refresh_pressed(self, event: Button.Pressed) -> None:
+        self.app.catalog_store.refresh()
         try:
-            self.screen.query_one(InstanceInfoPanel).refresh(recompose=True)
+            self.screen.query_one(InstanceInfoPanel).refresh_widget()
         except:
             pass
 
@@ -330,10 +348,10 @@ class BSOD(Screen):
 class InstanceWidget(Static):
     """Rich panel showing the current working instance."""
 
-    def __init__(self, inst: Optional[str] = None, **kwargs):
+    def __init__(self, inst: Optional[str] = None, processes=None, **kwargs):
         super().__init__(**kwargs)
         if isinstance(inst, str):
-            inst = instance_name_to_instance(inst)
+            inst = instance_name_to_instance(inst, processes=processes)
         self.inst = inst
 
     def _make_instance_panel(self) -> Panel:
@@ -416,9 +434,11 @@ class CollectionModal(ModalScreen):
         self.collection = collection
 
     def compose(self) -> ComposeResult:
+        from tabsdata.api.tabsdata_server import Collection
+
         with Container(id="popup"):
             yield ExitBar(mode="dismiss")
-            if isinstance(self.collection, Collection):
+            if isinstance(self.collection, (Collection, CachedCollection)):
                 options = ["Delete Collection"]
                 yield Static(
                     f"What would you like to do with the {self.collection.name} collection?",
@@ -443,21 +463,45 @@ class CollectionModal(ModalScreen):
     def _picked(self, event: ListView.Selected) -> None:
         selected = event.item.label
         if selected == "Delete Collection":
-            server: TabsdataServer = self.server
-            delete_collection = server.delete_collection(self.collection.name)
-        self.dismiss(delete_collection)
+            event.list_view.disabled = True
+            run_blocking(
+                self,
+                tabsdata_api.call_server,
+                self.server,
+                "delete_collection",
+                self.collection.name,
+                key="delete_collection",
+            )
+            return
+        self.dismiss(None)
 
     @on(Input.Submitted)
     def _inputed(self, event: Input.Submitted) -> None:
         value = event.input.value
         if event.validation_result.is_valid:
-            server: TabsdataServer = self.server
             print(value)
-            create_collection = server.create_collection(value)
-            self.dismiss(create_collection)
+            event.input.disabled = True
+            run_blocking(
+                self,
+                tabsdata_api.call_server,
+                self.server,
+                "create_collection",
+                value,
+                key="create_collection",
+            )
         else:
             self.app.notify(f"{event.validation_result.failure_descriptions}")
 
+    @on(BlockingCallDone)
+    def _server_call_done(self, message: BlockingCallDone) -> None:
+        if message.error is not None:
+            self.app.notify(f"{message.error}", severity="error")
+            self.dismiss(None)
+            return
+        tabsdata_api.invalidate_server_cache(self.server)
+        self.app.catalog_store.refresh()
+        self.dismiss(message.result)
+
 
 class FunctionModal(ModalScreen):
     CSS = """
@@ -496,9 +540,11 @@ class FunctionModal(ModalScreen):
             self.collection_name = self.collection.name
 
     def compose(self) -> ComposeResult:
+        from tabsdata.api.tabsdata_server import Function
+
         with Container(id="popup"):
             yield ExitBar(mode="dismiss")
-            if isinstance(self.function, Function):
+            if isinstance(self.function, (Function, CachedFunction)):
                 options = ["Trigger Function"]
                 yield Static(
                     f"What would you like to do with the {self.function.name} function?",
@@ -603,13 +649,29 @@ class FunctionModal(ModalScreen):
     def _inputed(self, event: Input.Submitted) -> None:
         value = event.input.value
         if event.validation_result.is_valid:
-            server: TabsdataServer = self.server
             print(value)
-            create_collection = server.create_collection(value)
-            self.dismiss(create_collection)
+            event.input.disabled = True
+            run_blocking(
+                self,
+                tabsdata_api.call_server,
+                self.server,
+                "create_collection",
+                value,
+                key="create_collection",
+            )
         else:
             self.app.notify(f"{event.validation_result.failure_descriptions}")
 
+    @on(BlockingCallDone)
+    def _server_call_done(self, message: BlockingCallDone) -> None:
+        if message.error is not None:
+            self.app.notify(f"{message.error}", severity="error")
+            self.dismiss(None)
+            return
+        tabsdata_api.invalidate_server_cache(self.server)
+        self.app.catalog_store.refresh()
+        self.dismiss(message.result)
+
 
 class InstanceInfoPanel(Horizontal):
     DEFAULT_CSS = """
@@ -645,16 +707,29 @@ InstanceInfoPanel .box > ListView {
         self.selected_table = None
         self.selected_table_name = None
         self.recompile_td_data()
-        tabsdata_api.sync_instance_to_db(self.app)
+
+    def on_mount(self) -> None:
+        store = self.app.catalog_store
+        store.subscribe(self)
+        if store.source != LIVE:
+            store.refresh()
+
+    def on_unmount(self) -> None:
+        self.app.catalog_store.unsubscribe(self)
+
+    def on_catalog_changed(self, message: CatalogChanged) -> None:
+        if message.kind != "collection" and (
+            message.collection != self.selected_collection_name
+        ):
+            return
+        self.refresh_widget()
 
     def resolve_working_instance(self, instance=None):
+        # The instance watcher keeps app.working_instance current; reading it
+        # here keeps filesystem syncs off the event loop.
         if isinstance(instance, str):
-            instance = instance_name_to_instance(instance)
-        sync_filesystem_instances_to_db(app=self.app)
-        working_instance = self.app.app_query_session(
-            "instances", limit=1, working=True
-        )
-        return working_instance or instance
+            instance = self.app.app_query_session("instances", limit=1, name=instance)
+        return self.app.working_instance or instance
 
     def refresh_widget(self):
         self.recompile_td_data()
@@ -664,8 +739,10 @@ InstanceInfoPanel .box > ListView {
         self.instance = self.resolve_working_instance()
         self.tabsdata_server = self.app.tabsdata_server
         self.tabsdata_server: TabsdataServer
+        store = self.app.catalog_store
+        store.sync_instance()
         try:
-            self.collection_list = self.tabsdata_server.list_collections()
+            self.collection_list = store.collection_list()
             self.selected_collection = None
             if self.selected_collection_name is not None:
                 self.selected_collection = next(
@@ -677,10 +754,10 @@ InstanceInfoPanel .box > ListView {
                     None,
                 )
 
-            if self.selected_collection and self.tabsdata_server:
+            if self.selected_collection:
                 coll_name = getattr(self.selected_collection, "name", None)
-                self.function_list = self.tabsdata_server.list_functions(coll_name)
-                self.table_list = self.tabsdata_server.list_tables(coll_name)
+                self.function_list = store.functions_of(coll_name)
+                self.table_list = store.tables_of(coll_name)
             else:
                 self.function_list = []
                 self.table_list = []
@@ -694,12 +771,14 @@ InstanceInfoPanel .box > ListView {
         "CurrentCollectionsWidget Label, CurrentCollectionsWidget LabelItem",
     )
     async def handle_double_click_collection(self, event: events.Click):
+        from tabsdata.api.tabsdata_server import Collection
+
         if event.button == 1 and getattr(event, "chain", 1) >= 2:
             if isinstance(event.widget, LabelItem):
                 label = event.widget
             else:
                 label = event.widget.parent
-            if isinstance(label.label, (Collection, str)):
+            if isinstance(label.label, (Collection, CachedCollection, str)):
                 collection = self.handle_collection_modal_response(
                     self.app.tabsdata_server, label
                 )
@@ -711,12 +790,14 @@ InstanceInfoPanel .box > ListView {
         "CurrentFunctionsWidget Label, CurrentFunctionsWidget LabelItem",
     )
     async def handle_double_click_function(self, event: events.Click):
+        from tabsdata.api.tabsdata_server import Function
+
         if event.button == 1 and getattr(event, "chain", 1) >= 2:
             if isinstance(event.widget, LabelItem):
                 label = event.widget
             else:
                 label = event.widget.parent
-            if isinstance(label.label, (Function, str)):
+            if isinstance(label.label, (Function, CachedFunction, str)):
                 collection = self.handle_function_modal_response(
                     self.app.tabsdata_server, label
                 )
@@ -912,8 +993,15 @@ class CurrentInstanceWidget(CurrentStateWidgetTemplate):
 
 
 class CurrentCollectionsWidget(CurrentStateWidgetTemplate):
+    def on_mount(self) -> None:
+        self.set_interval(10, self._update_age)
+
+    def _update_age(self) -> None:
+        self.border_subtitle = self.app.catalog_store.describe_age()
+
     def generate_internals(self, collections=None):
         """Converts List to a ListView"""
+        self._update_age()
         collections = list(self.parent.collection_list or [])
         choiceLabels = [LabelItem(getattr(i, "name", ""), i) for i in collections]
         self.list = ListView(*choiceLabels)
@@ -1185,8 +1273,13 @@ class InstanceSelectionScreen(ListScreenTemplate):
         self.set_focus(self.list)
 
     def list_items(self):
+        # Choices given by name share one process table scan.
+        processes = None
+        if any(isinstance(i, str) for i in self.choices):
+            processes = scan_apiserver_processes()
         choiceLabels = [
-            LabelItem(label=InstanceWidget(i), override_label=i) for i in self.choices
+            LabelItem(label=InstanceWidget(i, processes), override_label=i)
+            for i in self.choices
         ]
         self.list = ListView(*choiceLabels)
         return self.list
@@ -1271,7 +1364,26 @@ class MainScreen(ListScreenTemplate):
 
 
 class BottomAwareCliAutoComplete(CliAutoComplete):
-    """Place autocomplete above the input when there is not enough room below."""
+    """
+    Place autocomplete above the input when there is not enough room below.
+
+    Candidates come from local data only. When the catalog store changes
+    (e.g. values the screen asked for have been fetched) the open dropdown
+    is rebuilt in place from the current input.
+    """
+
+    def on_mount(self) -> None:
+        self.app.catalog_store.subscribe(self)
+
+    def on_unmount(self) -> None:
+        self.app.catalog_store.unsubscribe(self)
+
+    def on_catalog_changed(self, message: CatalogChanged) -> None:
+        # A hidden dropdown with options was dismissed by the user; leave it.
+        if self.target.has_focus and (
+            self.display or self.option_list.option_count == 0
+        ):
+            self._handle_target_update()
 
     def get_search_string(self, state: TargetState) -> str:
         # Candidates are already pre-filtered in candidates_callback.
@@ -1379,10 +1491,10 @@ class HomeTabbedScreen(Screen):
         super().__init__()
         self.cwd = Path.cwd()
         self.cli_root = self._build_cli_tree()
-        self._autocomplete_cache_ttl_seconds = 30.0
-        self._autocomplete_cache: dict[
-            tuple[str, str | None], tuple[float, list[str]]
-        ] = {}
+        self._cli_parser = CommandLineParser()
+        self._candidate_fetch_timer = None
+        self._candidate_fetches: dict[tuple, float] = {}
+        self._cli_tree_requested = False
         self.main_choice_dict = {
             "Instance Management": InstanceManagementScreen,
             "Asset Management": AssetManagementScreen,
@@ -1478,6 +1590,7 @@ class HomeTabbedScreen(Screen):
         elif label == "CLI":
             switcher.current = "cli-panel"
             self.query_one("#cli-input", Input).focus()
+            self._load_cli_tree()
 
     @on(ListView.Selected, "#main-list")
     def on_main_list_selected(self, event: ListView.Selected) -> None:
@@ -1599,6 +1712,7 @@ class HomeTabbedScreen(Screen):
             except Exception:
                 pass
         switcher.current = "cli-panel"
+        self._load_cli_tree()
         if self.cli_input_widget is None or self.cli_log_widget is None:
             self.cli_prompt_widget = self.query_one("#cli-prompt", Static)
             self.cli_log_widget = self.query_one("#cli-log", RichLog)
@@ -1834,12 +1948,17 @@ class HomeTabbedScreen(Screen):
                 self._cli_screen[self._cli_cursor_row][c] = " "
 
     def candidates_callback(self, state: TargetState) -> list[DropdownItem]:
-        base_items = self._pull_command_suggestions(self.cli_root, state.text)
-        active_param, current_fragment = self._active_parameter_context(state.text)
-        scope = self._command_scope(state.text)
+        line = self._cli_parser.parse(state.text)
+        active_param, current_fragment = line.active_parameter, line.fragment
+        scope = line.scope
+
+        if active_param == "--coll":
+            self._request_missing_candidates(None)
+        elif active_param == "--name":
+            self._request_missing_candidates(line.collection_arg)
 
         if active_param == "--coll":
-            selected_name = self._extract_name_arg(state.text)
+            selected_name = line.name_arg
             if selected_name:
                 items = self._filter_by_prefix(
                     self._collections_for_name(selected_name, scope),
@@ -1851,7 +1970,7 @@ class HomeTabbedScreen(Screen):
                     current_fragment,
                 )
         elif active_param == "--name":
-            collection = self._extract_collection_arg(state.text)
+            collection = line.collection_arg
             if scope == "table":
                 dynamic_names = self._live_table_names(collection)
             elif scope == "fn":
@@ -1870,18 +1989,22 @@ class HomeTabbedScreen(Screen):
                 current_fragment,
             )
         else:
-            if self._is_partial_token_context(state.text):
-                items = self._filter_by_prefix(base_items, current_fragment)
-            else:
-                items = base_items
+            items = self._pull_command_suggestions(self.cli_root, line)
+            if line.is_partial:
+                items = self._filter_by_prefix(items, current_fragment)
 
         return [DropdownItem(item) for item in items]
 
-    def _build_cli_tree(self) -> Node:
+    def _build_cli_tree(self, td_node: Node | None = None) -> Node:
+        """
+        Completion trie for td and tdserver. td_node is the tree generated
+        from the installed td CLI; without it a hand-written subset is used.
+        tdserver is a native binary with no Click app to introspect, so its
+        commands are always listed here.
+        """
         root = Node("root")
 
-        td_node = Node(name="td")
-        root.add_child(td_node)
+        root.add_child(td_node or self._build_fallback_td_tree())
 
         tdserver_node = Node("tdserver")
         root.add_child(tdserver_node)
@@ -1891,6 +2014,11 @@ class HomeTabbedScreen(Screen):
             instance_node = i.add_child(Node(name="--instance", parameter=True))
             instance_node.add_child(Node(name="__instance_value__", parameter_arg=True))
 
+        return root.freeze()
+
+    def _build_fallback_td_tree(self) -> Node:
+        td_node = Node(name="td")
+
         fn = td_node.add_child(Node("fn"))
         fn_register = fn.add_child("register")
         fn_trigger = fn.add_child("trigger")
@@ -1905,188 +2033,114 @@ class HomeTabbedScreen(Screen):
         sample.add_child(["--coll", "--name"])
         schema.add_child(["--coll", "--name"])
 
-        colls = root.recur_search("--coll")
-        for node in colls:
-            node.add_child(["__coll_value__"])
-            node.parameter = True
-            for child in node.children:
-                child.parameter_arg = True
+        for option in ("--coll", "--name", "--path"):
+            for node in td_node.recur_search(option):
+                node.add_child([f"__{option[2:]}_value__"])
+                node.parameter = True
+                for child in node.children:
+                    child.parameter_arg = True
 
-        names = root.recur_search("--name")
-        for node in names:
-            node.add_child(["__name_value__"])
-            node.parameter = True
-            for child in node.children:
-                child.parameter_arg = True
+        return td_node
 
-        return root
+    def _load_cli_tree(self) -> None:
+        """Swap in the td tree generated from the installed CLI, once."""
+        if self._cli_tree_requested:
+            return
+        self._cli_tree_requested = True
+        run_blocking(self, load_td_cli_tree, key="td_cli_tree")
 
-    def _pull_command_suggestions(self, root: Node, text: str) -> list[str]:
-        try:
-            split_text = shlex.split(text)
-        except ValueError:
-            split_text = text.split(" ")
+    @on(BlockingCallDone)
+    def _cli_tree_loaded(self, message: BlockingCallDone) -> None:
+        if message.key == "td_cli_tree" and message.result is not None:
+            self.cli_root = self._build_cli_tree(message.result)
 
+    def _pull_command_suggestions(self, root: Node, line: CommandLine) -> list[str]:
+        split_text = line.tokens
         cursor = root
-        children = cursor.children
-        param_list = []
+        # Node whose flags are offered once a parameter has no children left.
+        param_owner = None
+        prefix = ""
 
         for index, word in enumerate(split_text):
             if not word:
                 continue
+            if not cursor.sorted_keys and param_owner is not None:
+                # A flag takes no value; the next token belongs to its command.
+                cursor = param_owner
             is_last = index == len(split_text) - 1
-            treat_as_partial = is_last and not text.endswith(" ")
+            treat_as_partial = is_last and line.is_partial
             found_child = cursor.get_child(word)
             if treat_as_partial and found_child is not None:
                 # Exact match on the token currently being typed:
                 # keep suggestions at current level until user commits with space.
+                prefix = word
                 break
             if not found_child:
+                if cursor.parameter is True and treat_as_partial and cursor.visible_names:
+                    # Completing one of the option's choices.
+                    prefix = word
+                    break
                 if cursor.parameter is True:
                     # Accept dynamic parameter values (not explicitly in the tree)
                     # and continue from the parameter's parent so sibling flags
                     # like --name can still be suggested.
                     if cursor.parent is not None:
-                        param_list = cursor.parent.children
-                        cursor = cursor.parent
-                        children = cursor.children
+                        param_owner = cursor = cursor.parent
                         continue
                     return []
+                if treat_as_partial:
+                    prefix = word
                 break
-            if found_child.parameter is True:
-                param_list = cursor.children
+            if found_child.parameter is True or found_child.name.startswith("-"):
+                param_owner = cursor
             if found_child.parameter_arg is True:
-                param_list = cursor.parent.children
-                cursor = cursor.parent
+                param_owner = cursor = cursor.parent
             else:
                 cursor = found_child
-            children = cursor.children
 
-        results = children
-        if len(children) == 0 and len(param_list) > 0:
-            results = param_list
+        node = cursor
+        if not cursor.sorted_keys and param_owner is not None:
+            node = param_owner
 
-        names = [node.name for node in results]
-        names = [name for name in names if not name.startswith("__")]
-        existing_params = [token for token in split_text if token.startswith("--")]
-        return [name for name in names if name not in existing_params]
+        names = node.complete(prefix)
+        return [name for name in names if name not in line.given_flags]
 
-    def _safe_split(self, text: str) -> list[str]:
-        try:
-            return shlex.split(text)
-        except ValueError:
-            return [part for part in text.split(" ") if part]
-
-    def _active_parameter_context(self, text: str) -> tuple[str | None, str]:
-        tokens = self._safe_split(text)
-        if not tokens:
-            return None, ""
-
-        ends_with_space = text.endswith(" ")
-        current_fragment = "" if ends_with_space else tokens[-1]
+    def _request_missing_candidates(self, collection: str | None) -> None:
+        """
+        Ask the catalog store to reload when it has nothing for the
+        completion being typed. The request fires once typing pauses for
+        CANDIDATE_FETCH_DEBOUNCE; each keystroke restarts the wait, and the
+        same gap is not fetched again within CANDIDATE_REFETCH_INTERVAL.
+        """
+        store = self.app.catalog_store
+        missing = store.refreshed_at is None or (
+            collection is not None and collection not in store.collections
+        )
+        if self._candidate_fetch_timer is not None:
+            self._candidate_fetch_timer.stop()
+            self._candidate_fetch_timer = None
+        if not missing:
+            return
+        key = (store.instance_name, collection)
+        last = self._candidate_fetches.get(key)
+        if last is not None and time.monotonic() - last < CANDIDATE_REFETCH_INTERVAL:
+            return
 
-        if ends_with_space:
-            previous = tokens[-1]
-        else:
-            previous = tokens[-2] if len(tokens) > 1 else None
-
-        if previous in {"--coll", "--name", "--instance"}:
-            return previous, current_fragment
-        return None, current_fragment
-
-    def _extract_collection_arg(self, text: str) -> str | None:
-        tokens = self._safe_split(text)
-        collection: str | None = None
-        for index, token in enumerate(tokens[:-1]):
-            if token == "--coll":
-                candidate = tokens[index + 1]
-                if not candidate.startswith("--"):
-                    collection = candidate
-        return collection
-
-    def _extract_name_arg(self, text: str) -> str | None:
-        tokens = self._safe_split(text)
-        name: str | None = None
-        for index, token in enumerate(tokens[:-1]):
-            if token == "--name":
-                candidate = tokens[index + 1]
-                if not candidate.startswith("--"):
-                    name = candidate
-        return name
-
-    def _command_scope(self, text: str) -> str | None:
-        tokens = self._safe_split(text)
-        if len(tokens) < 2:
-            return None
-        if tokens[0] != "td":
-            if tokens[0] == "tdserver":
-                return "tdserver"
-            return None
-        if tokens[1] in {"table", "fn"}:
-            return tokens[1]
-        return None
+        def fetch() -> None:
+            self._candidate_fetch_timer = None
+            self._candidate_fetches[key] = time.monotonic()
+            store.refresh()
 
-    def _get_cached_autocomplete(self, key: tuple[str, str | None]) -> list[str] | None:
-        cached = self._autocomplete_cache.get(key)
-        if cached is None:
-            return None
-        cached_at, values = cached
-        if (time.monotonic() - cached_at) > self._autocomplete_cache_ttl_seconds:
-            self._autocomplete_cache.pop(key, None)
-            return None
-        return list(values)
-
-    def _set_cached_autocomplete(
-        self, key: tuple[str, str | None], values: list[str]
-    ) -> list[str]:
-        sorted_values = sorted(values)
-        self._autocomplete_cache[key] = (time.monotonic(), sorted_values)
-        return list(sorted_values)
+        self._candidate_fetch_timer = self.set_timer(CANDIDATE_FETCH_DEBOUNCE, fetch)
 
     def _live_collection_names(self) -> list[str]:
-        cache_key = ("collections", None)
-        cached = self._get_cached_autocomplete(cache_key)
-        if cached is not None:
-            return cached
-        collections = tabsdata_api.pull_all_collections(self.app)
-        names = list({getattr(item, "name", str(item)) for item in collections})
-        return self._set_cached_autocomplete(cache_key, names)
+        return self.app.catalog_store.collection_names()
 
     def _live_function_names(self, collection: str | None) -> list[str]:
-        cache_key = ("functions", collection)
-        cached = self._get_cached_autocomplete(cache_key)
-        if cached is not None:
-            return cached
-
-        if collection:
-            functions = tabsdata_api.pull_functions_from_collection(
-                self.app, collection
-            )
-            names = list({getattr(item, "name", str(item)) for item in functions})
-            return self._set_cached_autocomplete(cache_key, names)
-
-        names: set[str] = set()
-        for coll in self._live_collection_names():
-            functions = tabsdata_api.pull_functions_from_collection(self.app, coll)
-            names.update(getattr(item, "name", str(item)) for item in functions)
-        return self._set_cached_autocomplete(cache_key, list(names))
+        return self.app.catalog_store.function_names(collection)
 
     def _live_table_names(self, collection: str | None) -> list[str]:
-        cache_key = ("tables", collection)
-        cached = self._get_cached_autocomplete(cache_key)
-        if cached is not None:
-            return cached
-
-        if collection:
-            tables = tabsdata_api.pull_tables_from_collection(self.app, collection)
-            names = list({getattr(item, "name", str(item)) for item in tables})
-            return self._set_cached_autocomplete(cache_key, names)
-
-        names: set[str] = set()
-        for coll in self._live_collection_names():
-            tables = tabsdata_api.pull_tables_from_collection(self.app, coll)
-            names.update(getattr(item, "name", str(item)) for item in tables)
-        return self._set_cached_autocomplete(cache_key, list(names))
+        return self.app.catalog_store.table_names(collection)
 
     def _filter_by_prefix(self, items: list[str], prefix: str) -> list[str]:
         if not prefix:
@@ -2094,58 +2148,12 @@ class HomeTabbedScreen(Screen):
         return [item for item in items if item.startswith(prefix)]
 
     def _collections_for_name(self, name: str, scope: str | None) -> list[str]:
-        matching_collections: list[str] = []
-        for coll in self._live_collection_names():
-            if scope == "table":
-                table_names = self._live_table_names(coll)
-                if name in table_names:
-                    matching_collections.append(coll)
-            elif scope == "fn":
-                function_names = self._live_function_names(coll)
-                if name in function_names:
-                    matching_collections.append(coll)
-            else:
-                function_names = self._live_function_names(coll)
-                table_names = self._live_table_names(coll)
-                if name in function_names or name in table_names:
-                    matching_collections.append(coll)
-        return matching_collections
-
-    def _is_partial_token_context(self, text: str) -> bool:
-        """True when the last typed token is partial and should prefix-filter candidates."""
-        if text.endswith(" "):
-            return False
-
-        tokens = self._safe_split(text)
-        if not tokens:
-            return False
-
-        cursor = self.cli_root
-        for index, token in enumerate(tokens):
-            is_last = index == len(tokens) - 1
-            found = cursor.get_child(token)
-            if not found:
-                return True
-            if is_last:
-                # Exact last-token match without trailing space is still "in progress".
-                return True
-            if found.parameter_arg is True and found.parent is not None:
-                cursor = found.parent
-            else:
-                cursor = found
-
-        # Every token resolved exactly; next-token suggestions should not be filtered.
-        return False
+        kind = scope if scope in ("table", "fn") else None
+        return self.app.catalog_store.collections_containing(name, kind)
 
     def _live_instance_names(self) -> list[str]:
         try:
-            sync_filesystem_instances_to_db(app=self.app)
-        except Exception:
-            pass
-
-        try:
-            session: Session = self.app.session
-            instances = session.query(Instance).order_by(Instance.name).all()
+            instances = list_instances(app=self.app)
             return [instance.name for instance in instances]
         except Exception:
             return []
@@ -2440,6 +2448,8 @@ Checkbox:focus > .toggle--button {
                 for i in self.query("Input.inputs")
             ]
             values.append(self.query_one("Checkbox.inputs").value or False)
+            values[1] = int(values[1]) if str(values[1]).isdigit() else None
+            values[2] = int(values[2]) if str(values[2]).isdigit() else None
             new = {
                 "name": values[0] != self.instance.name,
                 "arg_ext": values[1] != self.instance.arg_ext,
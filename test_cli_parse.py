@@ -0,0 +1,86 @@
+import shlex
+
+import pytest
+
+from tdconsole.core.cli_parse import CommandLineParser, _Lexer
+
+SAMPLES = [
+    "",
+    " ",
+    "td",
+    "td ",
+    "td table sample --coll ",
+    "td table sample --coll my_coll --name t1",
+    "  td   fn\tlist  ",
+    "td fn list --coll 'my coll' --name \"a b\"",
+    "td '' \"\" x",
+    "td a''b \"\"c",
+    'td "a\\"b" "c\\\\d" "e\\nf" "g\\$h"',
+    "td a\\ b c\\'d",
+    "td 'a\\b' 'c\"d'",
+    "td a\"b c\"d 'e'f\"g\"",
+]
+
+
+def _lex(chunks):
+    lexer = _Lexer()
+    for chunk in chunks:
+        lexer.feed(chunk)
+    return lexer.result()
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_matches_shlex_split(text):
+    assert _lex([text]) == shlex.split(text)
+
+
+@pytest.mark.parametrize("text", SAMPLES)
+def test_split_feeds_match_one_feed(text):
+    # One character per feed, as while typing, and every two-way split.
+    assert _lex(list(text)) == shlex.split(text)
+    for cut in range(len(text) + 1):
+        assert _lex([text[:cut], text[cut:]]) == shlex.split(text)
+
+
+def test_empty_quotes_are_tokens():
+    assert _lex(["td '' x"]) == ["td", "", "x"]
+    assert _lex(['td "" ']) == ["td", ""]
+
+
+def test_backslash_in_double_quotes():
+    # Only \\ and \" are escapes inside double quotes; others stay literal.
+    assert _lex(['"a\\"b"']) == ['a"b']
+    assert _lex(['"a\\\\b"']) == ["a\\b"]
+    assert _lex(['"a\\nb"']) == ["a\\nb"]
+    assert _lex(['"a\\nb"']) == shlex.split('"a\\nb"')
+
+
+@pytest.mark.parametrize("text", ["td 'open", 'td "open', "td end\\", 'td "a\\'])
+def test_unbalanced_input_has_no_result(text):
+    with pytest.raises(ValueError):
+        shlex.split(text)
+    assert _lex([text]) is None
+    assert _lex(list(text)) is None
+
+
+def test_parser_falls_back_to_space_split():
+    parser = CommandLineParser()
+    line = parser.parse("td fn list --coll 'my co")
+    assert line.tokens == ("td", "fn", "list", "--coll", "'my", "co")
+    assert line.fragment == "co"
+
+
+def test_parser_recovers_when_quote_closes():
+    parser = CommandLineParser()
+    for cut in range(1, len("td fn --coll 'my coll' ") + 1):
+        line = parser.parse("td fn --coll 'my coll' "[:cut])
+    assert line.tokens == ("td", "fn", "--coll", "my coll")
+    assert line.collection_arg == "my coll"
+    assert line.ends_with_space
+
+
+def test_parser_retokenizes_after_edit():
+    parser = CommandLineParser()
+    parser.parse("td table 'a b'")
+    line = parser.parse("td fn 'a b'")
+    assert line.tokens == tuple(shlex.split("td fn 'a b'"))